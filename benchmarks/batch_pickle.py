@@ -0,0 +1,31 @@
+"""
+Compare pickling list of instances with RecordBatch.
+
+Run: python benchmarks/batch_pickle.py
+"""
+import pickle
+from dataclasses import dataclass
+from timeit import repeat
+
+from dataslots import dataslots, RecordBatch
+
+
+@dataslots
+@dataclass
+class Event:
+    timestamp: int
+    price: float
+    venue: str
+    active: bool
+
+
+if __name__ == '__main__':
+    size, number = 1_000_000, 3
+    events = [Event(i, i * 0.5, ('XWAR', 'XNYS', 'XLON')[i % 3], i % 2 == 0) for i in range(size)]
+
+    for name, obj in [('list', events), ('RecordBatch', RecordBatch(events))]:
+        payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        dump = min(repeat(lambda: pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), number=number, repeat=3))
+        load = min(repeat(lambda: pickle.loads(payload), number=number, repeat=3))
+        print(f'{name:<12} size {len(payload) / 2 ** 20:6.1f} MiB, dump {dump / number * 1000:7.1f} ms, '
+              f'load {load / number * 1000:7.1f} ms / {size} instances')
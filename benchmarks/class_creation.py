@@ -0,0 +1,47 @@
+"""
+Measure class creation throughput (e.g. classes generated dynamically from schema definitions).
+Structurally identical classes reuse functions generated by dataclass for the first one (dataslots.cache_info).
+
+Run: python benchmarks/class_creation.py
+"""
+import dataclasses
+import sys
+from timeit import repeat
+
+import dataslots
+
+
+def create_without_cache():
+    dataslots.cache_clear()
+    return dataslots.dataclass(slots=True)(make_class())
+
+
+def make_class():
+    class Record:
+        a: int
+        b: float = 0.0
+        c: str = ''
+        d: list = dataclasses.field(default_factory=list)
+
+        def total(self):
+            return self.a + self.b
+
+    return Record
+
+
+if __name__ == '__main__':
+    number = 2000
+    candidates = [
+        ('class statement only', make_class),
+        ('dataclasses.dataclass', lambda: dataclasses.dataclass(make_class())),
+        ('dataslots(dataclass)', lambda: dataslots.dataslots(dataclasses.dataclass(make_class()))),
+        ('dataslots.dataclass(slots=True)', lambda: dataslots.dataclass(slots=True)(make_class())),
+        ('dataslots.dataclass (no cache)', create_without_cache),
+    ]
+    if sys.version_info >= (3, 10):
+        candidates.append(('dataclasses.dataclass(slots=True)',
+                           lambda: dataclasses.dataclass(slots=True)(make_class())))
+
+    for name, stmt in candidates:
+        best = min(repeat(stmt, number=number, repeat=5)) / number
+        print(f'{name:<34} {best * 1e6:8.1f} us / class, {1 / best:8.0f} classes / s')
@@ -0,0 +1,56 @@
+"""
+Compare dataslots.columnar conversion with naive per-attribute list comprehensions.
+
+Run: python benchmarks/numpy_export.py
+"""
+from dataclasses import dataclass
+from timeit import repeat
+
+import numpy as np
+
+from dataslots import dataslots
+from dataslots.columnar import numpy_dtype, to_numpy, from_numpy
+
+
+@dataslots
+@dataclass
+class Tick:
+    timestamp: int
+    price: float
+    volume: int
+    bid: float
+    ask: float
+    active: bool
+
+
+def naive_to_numpy(ticks):
+    array = np.empty(len(ticks), dtype=numpy_dtype(Tick))
+    array['timestamp'] = [tick.timestamp for tick in ticks]
+    array['price'] = [tick.price for tick in ticks]
+    array['volume'] = [tick.volume for tick in ticks]
+    array['bid'] = [tick.bid for tick in ticks]
+    array['ask'] = [tick.ask for tick in ticks]
+    array['active'] = [tick.active for tick in ticks]
+    return array
+
+
+def naive_from_numpy(array):
+    return [Tick(int(row['timestamp']), float(row['price']), int(row['volume']), float(row['bid']),
+                 float(row['ask']), bool(row['active'])) for row in array]
+
+
+if __name__ == '__main__':
+    size, number = 100_000, 5
+    ticks = [Tick(i, i * 0.5, i % 100, i * 0.5 - 0.1, i * 0.5 + 0.1, i % 2 == 0) for i in range(size)]
+    array = to_numpy(ticks)
+    assert (naive_to_numpy(ticks) == array).all()
+    assert naive_from_numpy(array) == from_numpy(array, Tick) == ticks
+
+    for name, stmt in [
+        ('naive to_numpy', lambda: naive_to_numpy(ticks)),
+        ('dataslots to_numpy', lambda: to_numpy(ticks)),
+        ('naive from_numpy', lambda: naive_from_numpy(array)),
+        ('dataslots from_numpy', lambda: from_numpy(array, Tick)),
+    ]:
+        best = min(repeat(stmt, number=number, repeat=5)) / number
+        print(f'{name:<22} {best * 1000:8.2f} ms / {size} instances')
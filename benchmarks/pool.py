@@ -0,0 +1,47 @@
+"""
+Compare plain construction of short-lived instances with reusing them from Pool.
+
+Run: python benchmarks/pool.py
+
+Results (CPython 3.11, ns per instance): construction ~250, Pool ~220, Pool (clear) ~510, Pool (debug) ~600.
+On CPython 3.8 Pool is about 2x slower than construction.
+"""
+from dataclasses import dataclass
+from timeit import repeat
+
+from dataslots import dataslots, Pool
+
+
+@dataslots
+@dataclass
+class Tick:
+    timestamp: int
+    price: float
+    volume: int
+    venue: str
+
+
+def construct(number):
+    for i in range(number):
+        tick = Tick(i, 10.5, 100, 'XWAR')
+        del tick
+
+
+def pooled(pool, number):
+    acquire, release = pool.acquire, pool.release
+    for i in range(number):
+        tick = acquire(i, 10.5, 100, 'XWAR')
+        release(tick)
+
+
+if __name__ == '__main__':
+    number = 1_000_000
+    candidates = [
+        ('construction', lambda: construct(number)),
+        ('Pool', lambda: pooled(Pool(Tick), number)),
+        ('Pool (clear)', lambda: pooled(Pool(Tick, clear=True), number)),
+        ('Pool (debug)', lambda: pooled(Pool(Tick, debug=True), number)),
+    ]
+    for name, stmt in candidates:
+        best = min(repeat(stmt, number=1, repeat=5))
+        print(f'{name:<14} {best / number * 1e9:7.1f} ns / instance')
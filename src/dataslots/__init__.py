@@ -1,118 +1,740 @@
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
-from collections import ChainMap
+from collections import OrderedDict
+from collections.abc import Sequence
 from contextlib import contextmanager
-from dataclasses import fields, is_dataclass
+from copy import copy
+from copyreg import _slotnames  # type: ignore
+from functools import lru_cache, wraps
+from dataclasses import fields, is_dataclass, Field, MISSING, InitVar
+from dataclasses import _FIELD_INITVAR, _HAS_DEFAULT_FACTORY as _HAS_FACTORY  # type: ignore
 from dataclasses import dataclass as cpy_dataclass
-from inspect import isdatadescriptor
+from inspect import isdatadescriptor, getattr_static
+from itertools import repeat
+from operator import index
+from re import compile as re_compile
+from threading import Lock
+from types import CodeType, FunctionType
 
-from typing import overload, Optional, Dict, Tuple, Any, TypeVar, Callable, Type
+from typing import (overload, cast, Optional, Dict, Tuple, Any, TypeVar, Callable, Type, List, Iterable, Mapping, Set,
+                    ClassVar, NamedTuple, get_type_hints)
 
 try:
     from typing import final, dataclass_transform  # type: ignore
 except ImportError:
     from typing_extensions import final, dataclass_transform  # type: ignore
 
-__all__ = ['dataslots', 'dataclass', 'DataslotsDescriptor', 'DataDescriptor']
+try:
+    from dataclasses import KW_ONLY as _kw_only  # type: ignore
+except ImportError:
+    _kw_only = object()  # type: ignore
+
+try:
+    from pickle import PickleBuffer
+except ImportError:  # python < 3.8
+    PickleBuffer = cast(Any, None)  # type: ignore
+
+try:
+    from abc import update_abstractmethods  # type: ignore
+except ImportError:
+    def update_abstractmethods(cls):  # type: ignore
+        return cls
+
+try:
+    from types import CellType as _make_cell  # type: ignore
+except ImportError:  # python < 3.8
+    def _make_cell(value: Any) -> Any:  # type: ignore
+        return (lambda: value).__closure__[0]  # type: ignore
+
+__all__ = ['dataslots', 'dataclass', 'DataslotsDescriptor', 'DataDescriptor', 'BitField', 'Categorical', 'Categories',
+           'RecordBatch', 'Pool',
+           'changed_fields', 'clear_changes', 'cache_info', 'cache_clear']
 
 _DATASLOTS_DESCRIPTOR = '_dataslots_'
+_PACKED_SLOT = _DATASLOTS_DESCRIPTOR + 'packed_'
+_CHANGES_SLOT = '__dataslots_changes__'
+_TRACKED_FIELDS = '__dataslots_tracked_fields__'
+_BUFFER_TYPES = (bytes, bytearray, memoryview)
+_PER_CLASS_CACHE = '__dataslots_cache__'
+
+# Max number of classes processed by dataclass kept as templates for structurally identical classes
+_CLASS_CACHE_SIZE = 256
+
+# String annotations which are not dataclass fields (checked in the same way as in dataclasses module)
+_PSEUDO_FIELD_RE = re_compile(r'^\s*(?:\w+\.)*(?:ClassVar|InitVar|KW_ONLY)\b')
 
 
 # State is always tuple of two items if __slots__ are defined
 StateType = Tuple[Optional[Dict[str, Any]], Dict[str, Any]]
 DC = TypeVar('DC')
+F = TypeVar('F', bound=Callable[..., Any])
 
 
 def _get_data_descriptor_name(var_name: str) -> str:
     return _DATASLOTS_DESCRIPTOR + var_name
 
 
+def _create_fn(name: str, args: List[str], body: List[str], *, local_vars: Dict[str, Any]) -> Callable:
+    """
+    Create function using exec (same approach as in dataclasses module), local_vars are available in function body.
+    """
+    body_txt = '\n'.join(f'  {line}' for line in body)
+    txt = f' def {name}({", ".join(args)}):\n{body_txt}\n return {name}'
+    txt = f'def __create_fn__({", ".join(local_vars)}):\n{txt}'
+
+    ns: Dict[str, Any] = {}
+    exec(txt, None, ns)
+    return ns['__create_fn__'](**local_vars)
+
+
+def _cached_per_class(fn: F) -> F:
+    """
+    Cache results of function (taking class as the first argument) in class __dict__. Unlike lru_cache it does not
+    keep classes alive, so classes created at runtime can be garbage collected. Results for classes which do not
+    accept new attributes (e.g. builtins) are not cached.
+    """
+
+    @wraps(fn)
+    def wrapper(cls, *args, **kwargs):
+        cache = vars(cls).get(_PER_CLASS_CACHE) if isinstance(cls, type) else None
+        if cache is None:
+            cache = {}
+            try:
+                setattr(cls, _PER_CLASS_CACHE, cache)
+            except (TypeError, AttributeError):
+                return fn(cls, *args, **kwargs)
+
+        key = (fn, args, tuple(kwargs.items()))
+        try:
+            return cache[key]
+        except KeyError:
+            result = cache[key] = fn(cls, *args, **kwargs)
+            return result
+
+    return cast(F, wrapper)
+
+
+def _invalid_code(name: str, code: Any, categories: Categories) -> ValueError:
+    return ValueError('code {} of categorical field {!r} is out of range (0..{})'.format(
+        code, name, len(categories) - 1))
+
+
+@_cached_per_class
+def _record_builder(cls: type, names: Tuple[str, ...]) -> Callable[[Iterable[tuple]], List[Any]]:
+    """
+    Generate function creating instances of cls from rows of values (in names order). Like unpickling, __init__ is not
+    called and values are assigned directly (frozen classes are supported too). Codes are expected for categorical
+    fields (ValueError is raised for code out of range of categories).
+    """
+    direct = cls.__setattr__ is object.__setattr__
+    local_vars: Dict[str, Any] = {'_cls': cls, '_new': cls.__new__, '_setattr': object.__setattr__,
+                                  '_invalid_code': _invalid_code}
+    values = [f'_v{i}' for i in range(len(names))]
+
+    body = ['_result = []',
+            '_append = _result.append',
+            f'for ({"".join(value + ", " for value in values)}) in _rows:' if values else 'for _ in _rows:',
+            '  _obj = _new(_cls)']
+    for name, value in zip(names, values):
+        descriptor = getattr_static(cls, name, None)
+        if isinstance(descriptor, Categorical):
+            # Bulk paths use codes of categorical fields, out of range code would decode to wrong value (negative
+            # index) or fail on read
+            local_vars[f'_field_{value}'] = descriptor
+            body += [f'  if not 0 <= {value} < len(_field_{value}.categories):',
+                     f'    raise _invalid_code({name!r}, {value}, _field_{value}.categories)']
+            name = descriptor.slot_name
+            body.append(f'  _obj.{name} = {value}' if direct else f'  _setattr(_obj, {name!r}, {value})')
+        elif direct:
+            body.append(f'  _obj.{name} = {value}')
+        elif isdatadescriptor(descriptor):
+            local_vars[f'_set_{value}'] = descriptor.__set__  # type: ignore
+            body.append(f'  _set_{value}(_obj, {value})')
+        else:
+            body.append(f'  _setattr(_obj, {name!r}, {value})')
+    body += ['  _append(_obj)',
+             'return _result']
+
+    return _create_fn('_build_records', ['_rows'], body, local_vars=local_vars)
+
+
+@lru_cache(maxsize=128)
+def _record_values(names: Tuple[str, ...]) -> Callable[[Iterable[Any]], List[Any]]:
+    """
+    Generate function returning flat list of attribute values (in names order) of all instances.
+    """
+    values = ''.join(f'_obj.{name}, ' for name in names)
+    body = ['_result = []',
+            '_extend = _result.extend',
+            'for _obj in _instances:',
+            f'  _extend(({values}))',
+            'return _result']
+    return _create_fn('_get_values', ['_instances'], body, local_vars={})
+
+
+def _lookup(mro: Tuple[type, ...], name: str) -> Any:
+    """
+    Find class attribute without invoking descriptors (first class in mro which defines it).
+    """
+    for klass in mro:
+        klass_dict = klass.__dict__
+        if name in klass_dict:
+            return klass_dict[name]
+    return None
+
+
+def _inherited_slots(mro: Tuple[type, ...]) -> Set[str]:
+    slots: Set[str] = set()
+    for klass in mro:
+        klass_slots = klass.__dict__.get('__slots__', ())
+        slots.update((klass_slots,) if isinstance(klass_slots, str) else klass_slots)
+    return slots
+
+
+def _pack_bit_fields(mro: Tuple[type, ...], names: List[str], inherited_slots: Set[str]) -> None:
+    """
+    Assign BitField descriptors of class to one new integer slot (name is unique in class hierarchy). Descriptors
+    bound in base classes decorated with dataslots are skipped, descriptors bound to other classes are rejected.
+    """
+    cls = mro[0]
+    slot_name = _PACKED_SLOT + str(sum(1 for slot in inherited_slots if slot.startswith(_PACKED_SLOT)))
+    offset = 0
+    for name in names:
+        descriptor = _lookup(mro, name)
+        if not isinstance(descriptor, BitField) or (descriptor.is_bound and descriptor.slot_name in inherited_slots):
+            continue
+        owner = descriptor.owner
+        if descriptor.is_bound and owner is not None and owner is not cls:
+            raise TypeError('BitField {!r} is already used in class {}, create new BitField for each '
+                            'class'.format(name, owner.__qualname__))
+        offset = descriptor.bind(cls, slot_name, offset)
+
+
+def _is_pseudo_field(annotation: Any) -> bool:
+    if isinstance(annotation, str):
+        return _PSEUDO_FIELD_RE.match(annotation) is not None
+    return (annotation is ClassVar or getattr(annotation, '__origin__', None) is ClassVar or
+            annotation is InitVar or isinstance(annotation, InitVar) or annotation is _kw_only)
+
+
+def _predict_field_names(cls) -> List[str]:
+    """
+    Predict names of dataclass fields before class is processed by dataclass (using the same rules).
+    """
+    names: Dict[str, None] = {}
+    for base in cls.__mro__[-1:0:-1]:
+        if is_dataclass(base):
+            names.update(dict.fromkeys(field.name for field in fields(base)))
+
+    for name, annotation in cls.__dict__.get('__annotations__', {}).items():
+        if _is_pseudo_field(annotation):
+            names.pop(name, None)
+        else:
+            names[name] = None
+    return list(names)
+
+
+def _update_class_cells(cls_dict: Mapping[str, Any], old_cls: Any, new_cls: type) -> None:
+    """
+    Methods copied to new class still have closure cells (e.g. __class__ used by super()) pointing to old class.
+    """
+    for value in cls_dict.values():
+        if isinstance(value, (classmethod, staticmethod)):
+            value = value.__func__
+        elif isinstance(value, property):
+            value = value.fget
+
+        for cell in getattr(value, '__closure__', None) or ():
+            try:
+                if cell.cell_contents is old_cls:
+                    cell.cell_contents = new_cls
+            except ValueError:  # empty cell
+                pass
+
+
+def _slots_setstate(self, state: StateType):
+    for param_dict in filter(None, state):
+        for slot, value in param_dict.items():
+            object.__setattr__(self, slot, value)
+
+
+@_cached_per_class
+def _categorical_slots(cls: type) -> Dict[str, Categorical]:
+    descriptors = (getattr_static(cls, field.name, None) for field in fields(cls))
+    return {descriptor.slot_name: descriptor for descriptor in descriptors if isinstance(descriptor, Categorical)}
+
+
+def _categorical_getstate(self) -> StateType:
+    """
+    Codes of categorical fields are replaced with values, so state does not depend on categories of current process.
+    """
+    categorical = _categorical_slots(type(self))
+    state = {}
+    for slot in _slotnames(type(self)):
+        try:
+            value = getattr(self, slot)
+        except AttributeError:
+            continue
+        state[slot] = categorical[slot].categories.values[value] if slot in categorical else value
+    return getattr(self, '__dict__', None) or None, state
+
+
+def _categorical_setstate(self, state: StateType):
+    categorical = _categorical_slots(type(self))
+    _slots_setstate(self, (state[0], {slot: categorical[slot].categories.encode(value) if slot in categorical
+                                      else value for slot, value in state[1].items()}))
+
+
+def _tracking_setattr_fn(cls, names: List[str]) -> Callable:
+    """
+    Generate __setattr__ which marks assigned field in changes bitmask (bit number is field index) and calls
+    original __setattr__.
+    """
+    base_setattr = cls.__setattr__
+    changes = getattr_static(cls, _CHANGES_SLOT)
+    local_vars = {'_bits': {name: 1 << i for i, name in enumerate(names)},
+                  '_setattr': getattr(base_setattr, '_dataslots_base_setattr', base_setattr),
+                  '_get_changes': changes.__get__, '_set_changes': changes.__set__}
+    body = ['_setattr(self, name, value)',
+            '_bit = _bits.get(name)',
+            'if _bit is not None:',
+            '  try:',
+            '    _set_changes(self, _get_changes(self) | _bit)',
+            '  except AttributeError:',
+            '    _set_changes(self, _bit)']
+
+    fn = _create_fn('__setattr__', ['self', 'name', 'value'], body, local_vars=local_vars)
+    fn.__qualname__ = f'{cls.__qualname__}.__setattr__'
+    fn._dataslots_base_setattr = local_vars['_setattr']  # type: ignore
+    return fn
+
+
+def _restore_buffer(kind: type, data: Any) -> Any:  # pragma: no cover (python < 3.8)
+    """
+    Convert buffer received from pickle (in-band as bytes/bytearray or out-of-band as any buffer) to field type.
+    Copy is made only if original object is not available.
+    """
+    if type(data) is kind:
+        return data
+    view = memoryview(data)
+    if kind is memoryview:
+        return view
+    obj: Any = view.obj
+    if len(obj) == view.nbytes and type(obj) is kind:
+        return obj
+    return kind(view)
+
+
+class _PickledBuffer:  # pragma: no cover (python < 3.8)
+    """
+    Field value in pickle state, restored by _restore_buffer during loading (before __setstate__ is called).
+    """
+
+    __slots__ = ('kind', 'value')
+
+    def __init__(self, kind: type, value: Any):
+        self.kind = kind
+        self.value = value
+
+    def __reduce__(self):
+        return _restore_buffer, (self.kind, PickleBuffer(self.value))
+
+
+def _buffer_kind(annotation: Any) -> Optional[type]:  # pragma: no cover (python < 3.8)
+    """
+    Return buffer type (bytes, bytearray, memoryview) of annotation, Optional of buffer type is supported too.
+    String annotations (not resolved by get_type_hints) are matched by name of buffer type.
+    """
+    if isinstance(annotation, str):
+        annotation = next((kind for kind in _BUFFER_TYPES if kind.__name__ == annotation), None)
+    args: Tuple[Any, ...] = getattr(annotation, '__args__', ())
+    if len(args) == 2 and type(None) in args:
+        annotation = args[0] if args[1] is type(None) else args[1]
+    return annotation if annotation in _BUFFER_TYPES else None
+
+
+def _buffer_reduce_ex_fn(kinds: Dict[str, type]) -> Callable:  # pragma: no cover (python < 3.8)
+    """
+    Generate __reduce_ex__ which wraps (contiguous) values of buffer fields with PickleBuffer for protocol 5, so they
+    can be passed out-of-band (see buffer_callback in pickle.dumps).
+    """
+
+    def wrap_buffers(state: Any) -> Any:
+        if not isinstance(state, dict):
+            return state
+        return {name: _PickledBuffer(kinds[name], value)
+                if name in kinds and isinstance(value, _BUFFER_TYPES) and memoryview(value).contiguous else value
+                for name, value in state.items()}
+
+    def __reduce_ex__(self, protocol):
+        rv = cast(Tuple[Any, ...], object.__reduce_ex__(self, protocol))
+        if protocol < 5:
+            return rv
+        state = tuple(map(wrap_buffers, rv[2])) if isinstance(rv[2], tuple) else wrap_buffers(rv[2])
+        return rv[:2] + (state,) + rv[3:]
+
+    __reduce_ex__.buffer_kinds = kinds  # type: ignore
+    return __reduce_ex__
+
+
+def _buffer_kinds(mro: Tuple[type, ...], names: List[str]) -> Dict[str, type]:  # pragma: no cover (python < 3.8)
+    """
+    Find fields stored directly in slots and annotated with buffer type (annotation is taken from the first class
+    in mro which annotates field). Annotations are resolved with get_type_hints (e.g. postponed evaluation of
+    annotations), raw annotations are used if some of them cannot be resolved.
+    """
+    try:
+        hints = get_type_hints(mro[0])
+    except Exception:  # annotations can be any expression (e.g. forward reference to class being created)
+        hints = {}
+
+    kinds = {}
+    for name in names:
+        if isdatadescriptor(_lookup(mro, name)):
+            continue
+        annotations = (klass.__dict__.get('__annotations__', {}) for klass in mro)
+        kind = _buffer_kind(hints[name] if name in hints else next(
+            (klass_annotations[name] for klass_annotations in annotations if name in klass_annotations), None))
+        if kind is not None:
+            kinds[name] = kind
+    return kinds
+
+
+def _has_default_reduce(mro: Tuple[type, ...]) -> bool:  # pragma: no cover (python < 3.8)
+    reduce_ex = _lookup(mro, '__reduce_ex__')
+    return (_lookup(mro, '__reduce__') is object.__dict__['__reduce__'] and
+            (reduce_ex is object.__dict__['__reduce_ex__'] or hasattr(reduce_ex, 'buffer_kinds')))
+
+
+def _slotted_class(cls, names: List[str], *, add_dict: bool, add_weakref: bool, frozen: bool,
+                   track_changes: bool = False) -> Tuple[type, Dict[str, Any]]:
+    """
+    Create class with __slots__ from cls namespace. Returns new class and removed class attributes of fields
+    backed by slots (e.g. default values). Changes are tracked also in subclasses of tracked classes.
+    """
+    cls_dict: Dict[str, Any] = dict(cls.__dict__)
+    mro = cls.__mro__
+    track_changes = track_changes or hasattr(cls, _TRACKED_FIELDS)
+
+    # Create only missing slots
+    inherited_slots = _inherited_slots(mro)
+
+    _pack_bit_fields(mro, names, inherited_slots)
+
+    # Create slots list + space for data descriptors
+    field_names = set()
+    for name in names:
+        descriptor = _lookup(mro, name)
+        if isinstance(descriptor, DataDescriptor):
+            field_names.add(descriptor.slot_name)
+        elif not isdatadescriptor(descriptor):
+            field_names.add(name)
+
+    if add_dict:
+        field_names.add('__dict__')
+    if add_weakref:
+        field_names.add('__weakref__')
+    if track_changes:
+        field_names.add(_CHANGES_SLOT)
+
+    cls_dict['__slots__'] = tuple(field_names - inherited_slots)
+
+    # Erase filed names from class __dict__
+    removed = {name: cls_dict.pop(name) for name in field_names if name in cls_dict}
+
+    # Erase __dict__, __weakref__ and cache of generated functions (new class gets its own)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    cls_dict.pop(_PER_CLASS_CACHE, None)
+
+    # Pickle fix for frozen dataclass as mentioned in https://bugs.python.org/issue36424
+    # Use only if __getstate__ and __setstate__ are not declared and frozen=True
+    # (the same is used with track_changes to restore changes without marking fields on load)
+    if all(param not in cls_dict for param in ['__getstate__', '__setstate__']):
+        if any(isinstance(_lookup(mro, name), Categorical) for name in names):
+            cls_dict['__getstate__'] = _categorical_getstate
+            cls_dict['__setstate__'] = _categorical_setstate
+        elif frozen or track_changes:
+            cls_dict['__setstate__'] = _slots_setstate
+
+    # Out-of-band buffers (pickle protocol 5) for fields annotated with bytes, bytearray or memoryview
+    if PickleBuffer is not None and _has_default_reduce(mro):  # pragma: no cover (python < 3.8)
+        kinds = _buffer_kinds(mro, names)
+        if kinds:
+            cls_dict['__reduce_ex__'] = _buffer_reduce_ex_fn(kinds)
+
+    # Prepare new class with slots
+    new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    new_cls.__qualname__ = getattr(cls, '__qualname__')
+
+    if track_changes:
+        setattr(new_cls, _TRACKED_FIELDS, tuple(names))
+        setattr(new_cls, '__setattr__', _tracking_setattr_fn(new_cls, names))
+
+    return new_cls, removed
+
+
 @overload
 def dataslots(_cls: Type[DC]) -> Type[DC]: ...
 
 
 @overload
-def dataslots(*, add_dict: bool = ..., add_weakref: bool = ...) -> Callable[[Type[DC]], Type[DC]]: ...
+def dataslots(*, add_dict: bool = ..., add_weakref: bool = ...,
+              track_changes: bool = ...) -> Callable[[Type[DC]], Type[DC]]: ...
 
 
-def dataslots(_cls=None, *, add_dict=False, add_weakref=False):
+def dataslots(_cls=None, *, add_dict=False, add_weakref=False, track_changes=False):
     """
     Decorator to add __slots__ to class created by dataclass. Returns new class object as it's not possible
     to add __slots__ after class creation.
-    """
 
-    def _slots_setstate(self, state: StateType):
-        for param_dict in filter(None, state):
-            for slot, value in param_dict.items():
-                object.__setattr__(self, slot, value)
+    With track_changes=True assignments of fields are recorded in bitmask slot (check changed_fields). Subclasses
+    of tracked class decorated with dataslots track changes of all fields (including their own).
+    """
 
     def wrap(cls):
         if not is_dataclass(cls):
             raise TypeError('dataslots can be used only with dataclass')
 
-        cls_dict: Dict[str, Any] = dict(cls.__dict__)
-        if '__slots__' in cls_dict:
+        if '__slots__' in cls.__dict__:
             raise TypeError('do not define __slots__ if dataslots decorator is used')
 
-        # Create only missing slots
-        inherited_slots = set().union(*(getattr(c, '__slots__', set()) for c in cls.mro()))
-        mro_dict = ChainMap(*(getattr(c, '__dict__', {}) for c in cls.mro()))
-
-        # Create slots list + space for data descriptors
-        field_names = set()
-        for field in fields(cls):
-            if isinstance(mro_dict.get(field.name), DataDescriptor):
-                field_names.add(mro_dict[field.name].slot_name)
-            elif not isdatadescriptor(mro_dict.get(field.name)):
-                field_names.add(field.name)
-
-        if add_dict:
-            field_names.add('__dict__')
-        if add_weakref:
-            field_names.add('__weakref__')
-
-        cls_dict['__slots__'] = tuple(field_names - inherited_slots)
-
-        # Erase filed names from class __dict__
-        for field_name in field_names:
-            cls_dict.pop(field_name, None)
-
-        # Erase __dict__ and __weakref__
-        cls_dict.pop('__dict__', None)
-        cls_dict.pop('__weakref__', None)
-
-        # Pickle fix for frozen dataclass as mentioned in https://bugs.python.org/issue36424
-        # Use only if __getstate__ and __setstate__ are not declared and frozen=True
-        if all(param not in cls_dict for param in ['__getstate__', '__setstate__']) and \
-                cls.__dataclass_params__.frozen:
-            cls_dict['__setstate__'] = _slots_setstate
+        if track_changes and cls.__dataclass_params__.frozen:
+            raise TypeError('track_changes cannot be used with frozen dataclass')
 
-        # Prepare new class with slots
-        new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
-        new_cls.__qualname__ = getattr(cls, '__qualname__')
+        new_cls, _ = _slotted_class(cls, [field.name for field in fields(cls)], add_dict=add_dict,
+                                    add_weakref=add_weakref, frozen=cls.__dataclass_params__.frozen,
+                                    track_changes=track_changes)
 
+        _update_class_cells(cls.__dict__, cls, new_cls)
         return new_cls
 
     return wrap if _cls is None else wrap(_cls)
 
 
+def _tracked_fields(obj: Any) -> Tuple[str, ...]:
+    names = getattr(type(obj), _TRACKED_FIELDS, None)
+    if names is None:
+        raise TypeError('changes are tracked only in classes decorated with dataslots(track_changes=True)')
+    return names
+
+
+def changed_fields(obj: Any) -> Tuple[str, ...]:
+    """
+    Return names of fields assigned (including assignments in __init__) since creation or last clear_changes call.
+    """
+    names = _tracked_fields(obj)
+    changes = getattr(obj, _CHANGES_SLOT, 0)
+    return tuple(name for i, name in enumerate(names) if changes >> i & 1)
+
+
+def clear_changes(obj: Any) -> None:
+    _tracked_fields(obj)
+    object.__setattr__(obj, _CHANGES_SLOT, 0)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _ClassTemplate(NamedTuple):
+    """
+    Class attributes set (or deleted) by dataclass processing of cls.
+    """
+    cls: type
+    changed: Dict[str, Any]
+    deleted: List[str]
+
+
+_class_cache: OrderedDict[Any, _ClassTemplate] = OrderedDict()
+_class_cache_stats = {'hits': 0, 'misses': 0}
+_class_cache_lock = Lock()  # classes may be created concurrently (e.g. modules imported in threads)
+
+
+def cache_info() -> CacheInfo:
+    """
+    Statistics of dataclass wrapper cache (classes structurally identical to already processed one reuse its
+    generated functions).
+    """
+    with _class_cache_lock:
+        return CacheInfo(_class_cache_stats['hits'], _class_cache_stats['misses'], _CLASS_CACHE_SIZE,
+                         len(_class_cache))
+
+
+def cache_clear() -> None:
+    with _class_cache_lock:
+        _class_cache.clear()
+        _class_cache_stats.update(hits=0, misses=0)
+
+
+# Defaults of these types are interchangeable if equal, other defaults (e.g. -0.0 equal to 0.0) are compared by
+# identity (cached template class keeps its defaults alive, so their ids are not reused)
+_EQUAL_DEFAULTS = (bool, int, str, bytes, type(None))
+
+
+def _value_key(value: Any) -> Any:
+    return (type(value), value) if type(value) in _EQUAL_DEFAULTS else id(value)
+
+
+def _default_key(value: Any) -> Any:
+    if isinstance(value, Field):
+        return (Field, _value_key(value.default), value.default_factory, value.init, value.repr, value.hash,
+                value.compare, tuple(value.metadata.items()), getattr(value, 'kw_only', MISSING))
+    return _value_key(value)
+
+
+def _class_cache_key(cls, options: Tuple[Any, ...]) -> Optional[Tuple[Any, ...]]:
+    """
+    Build key from everything dataclass uses to generate class attributes: module (namespace of generated functions),
+    bases, annotations, field defaults, defined special methods (and which are None, e.g. __hash__ set to None by
+    __eq__) and options. None is returned if key is not hashable.
+    """
+    cls_dict = cls.__dict__
+    annotations = cls_dict.get('__annotations__', {})
+    defaults = tuple((name, _default_key(value)) for name, value in cls_dict.items()
+                     if name in annotations or isinstance(value, Field))
+    special = frozenset((name, value is None) for name, value in cls_dict.items() if name[:2] == name[-2:] == '__')
+    key = (type(cls), cls.__module__, cls.__bases__, tuple(annotations.items()), defaults, special,
+           cls.__doc__ is None, options)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _copy_function(fn: FunctionType, old_cls: type, new_cls: type) -> FunctionType:
+    """
+    Copy function generated for old_cls, references to old_cls in closure (also in closures of wrapped functions)
+    are replaced with new_cls.
+    """
+    closure = []
+    for cell in fn.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:  # empty cell
+            closure.append(cell)
+            continue
+
+        if value is old_cls:
+            cell = _make_cell(new_cls)
+        elif isinstance(value, FunctionType):
+            cell = _make_cell(_copy_function(value, old_cls, new_cls))
+        closure.append(cell)
+
+    new_fn = FunctionType(fn.__code__, fn.__globals__, fn.__name__, fn.__defaults__,
+                          tuple(closure) if fn.__closure__ else None)
+    new_fn.__kwdefaults__ = fn.__kwdefaults__
+    new_fn.__annotations__ = dict(fn.__annotations__)
+    new_fn.__dict__.update(fn.__dict__)
+    new_fn.__doc__ = fn.__doc__
+    new_fn.__module__ = fn.__module__
+    qualname = fn.__qualname__
+    if qualname.startswith(old_cls.__qualname__ + '.'):
+        qualname = new_cls.__qualname__ + qualname[len(old_cls.__qualname__):]
+    new_fn.__qualname__ = qualname
+    return new_fn
+
+
+def _apply_template(template: _ClassTemplate, cls: type) -> None:
+    """
+    Set attributes created by dataclass for template class on structurally identical class.
+    """
+    for name, value in template.changed.items():
+        if isinstance(value, FunctionType):
+            value = _copy_function(value, template.cls, cls)
+        elif name == '__dataclass_fields__':
+            value = {field_name: copy(field) for field_name, field in value.items()}
+        elif name == '__doc__' and value.startswith(template.cls.__name__):
+            value = cls.__name__ + value[len(template.cls.__name__):]
+        setattr(cls, name, value)
+    for name in template.deleted:
+        delattr(cls, name)
+    update_abstractmethods(cls)
+
+
+def _process_dataclass(cls, kwargs: Dict[str, Any], key: Optional[Tuple[Any, ...]], names: List[str]):
+    """
+    Process class with dataclass or reuse attributes generated for structurally identical class (LRU cache).
+    None is returned if fields of processed class are not the predicted names (class is neither counted nor cached).
+    """
+    with _class_cache_lock:
+        template = _class_cache.get(key) if key is not None else None
+        if template is not None:
+            _class_cache.move_to_end(key)
+            _class_cache_stats['hits'] += 1
+    if template is not None:
+        _apply_template(template, cls)
+        return cls
+
+    before = dict(cls.__dict__)
+    cls = cpy_dataclass(**kwargs)(cls)
+    if [field.name for field in fields(cls)] != names:
+        return None
+
+    with _class_cache_lock:
+        _class_cache_stats['misses'] += 1
+        if key is not None:
+            after = cls.__dict__
+            _class_cache[key] = _ClassTemplate(cls, {name: value for name, value in after.items()
+                                                     if name not in before or before[name] is not value},
+                                               [name for name in before if name not in after])
+            if len(_class_cache) > _CLASS_CACHE_SIZE:
+                _class_cache.popitem(last=False)
+    return cls
+
+
 @overload
 def dataclass(_cls: Type[DC]) -> Type[DC]: ...
 
 
 @overload
-def dataclass(*, slots: bool = ..., weakref_slot: bool = ..., **kwargs) -> Callable[[Type[DC]], Type[DC]]: ...
+def dataclass(*, slots: bool = ..., weakref_slot: bool = ..., track_changes: bool = ...,
+              **kwargs) -> Callable[[Type[DC]], Type[DC]]: ...
 
 
 @dataclass_transform()
-def dataclass(_cls=None, *, slots=False, weakref_slot=False, **kwargs):
+def dataclass(_cls=None, *, slots=False, weakref_slot=False, track_changes=False, **kwargs):
     if not slots:
         raise TypeError('slots is False, use dataclasses.dataclass instead')
+    if track_changes and kwargs.get('frozen', False):
+        raise TypeError('track_changes cannot be used with frozen dataclass')
 
     def wrap(cls):
-        cls = cpy_dataclass(**kwargs)(cls)
-        return dataslots(add_weakref=weakref_slot)(cls)
+        if '__slots__' in cls.__dict__:
+            return dataslots(add_weakref=weakref_slot, track_changes=track_changes)(cpy_dataclass(**kwargs)(cls))
+
+        # Create class with slots first and process it with dataclass, so there's no intermediate dataclass.
+        # It doesn't make class creation faster (exec in dataclass dominates, see benchmarks/class_creation.py), but
+        # functions generated by dataclass refer to the final class. Class cache depends on it: cached functions are
+        # copied to structurally identical class by replacing references to the template class only (closure cells of
+        # intermediate dataclass are updated to its slotted copy, so they could not be matched).
+        # Field defaults are visible as class attributes only while dataclass is processing the class.
+        key = _class_cache_key(cls, (weakref_slot, track_changes, tuple(sorted(kwargs.items()))))
+        names = _predict_field_names(cls)
+        new_cls, removed = _slotted_class(cls, names, add_dict=False, add_weakref=weakref_slot,
+                                          frozen=kwargs.get('frozen', False), track_changes=track_changes)
+        members = {name: new_cls.__dict__[name] for name in removed if name in new_cls.__dict__}
+        for name, value in removed.items():
+            setattr(new_cls, name, value)
+
+        new_cls = _process_dataclass(new_cls, kwargs, key, names)
+        if new_cls is None:
+            # Prediction failed (e.g. aliased ClassVar in string annotation), use intermediate dataclass
+            return dataslots(add_weakref=weakref_slot, track_changes=track_changes)(cpy_dataclass(**kwargs)(cls))
+
+        for name in removed:
+            if name in members:
+                setattr(new_cls, name, members[name])
+            elif name in new_cls.__dict__:
+                delattr(new_cls, name)
+
+        _update_class_cells(cls.__dict__, cls, new_cls)
+        return new_cls
 
     return wrap if _cls is None else wrap(_cls)
 
@@ -192,3 +814,362 @@ class DataslotsDescriptor(DataDescriptor, metaclass=ABCMeta):
     def delete_value(self, instance):
         with self._attribute_error():
             delattr(instance, self.__slot_name)
+
+
+class BitField(DataDescriptor):
+    """
+    Data descriptor storing small integer (bool, IntEnum, ...) value in a few bits. All BitFields declared in class
+    decorated with dataslots share one integer slot per instance.
+
+    Values are converted with operator.index on assignment and with `kind` on read, so kind=bool or IntEnum subclass
+    can be used to restore original type.
+    """
+
+    __slots__ = ('width', 'signed', 'kind', 'default', 'dataclass_field', 'owner', '_slot_name', '_shift', '_mask',
+                 '_min', '_max')
+
+    def __init__(self, width: int, *, default: Any = MISSING, signed: bool = False, kind: Callable[[int], Any] = int):
+        if not isinstance(width, int) or width < 1:
+            raise ValueError('width must be positive integer')
+
+        self.width = width
+        self.signed = signed
+        self.kind = kind
+        self.default = default
+        self.dataclass_field: Optional[str] = None
+        self.owner: Optional[type] = None
+        self._slot_name: Optional[str] = None
+        self._shift = 0
+        self._mask = (1 << width) - 1
+        self._min = -(1 << (width - 1)) if signed else 0
+        self._max = (1 << (width - 1)) - 1 if signed else self._mask
+
+    def __set_name__(self, owner, name):
+        self.dataclass_field = name
+        # Class with slots created by dataslots from namespace of bound owner is not a new owner
+        if not self.is_bound:
+            self.owner = owner
+
+    @property
+    def is_bound(self) -> bool:
+        return self._slot_name is not None
+
+    def bind(self, owner: type, slot_name: str, offset: int) -> int:
+        """
+        Place field at given bit offset of slot, returns offset for next field.
+        """
+        self.owner = owner
+        self._slot_name = slot_name
+        self._shift = offset
+        return offset + self.width
+
+    @property
+    def slot_name(self) -> str:
+        if self._slot_name is None:
+            raise TypeError('BitField {!r} can be used only in class decorated with dataslots'.format(
+                self.dataclass_field))
+        return self._slot_name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            if self.default is MISSING:
+                raise AttributeError(self.dataclass_field)
+            return self.default
+
+        value = (getattr(instance, self.slot_name, 0) >> self._shift) & self._mask
+        if self.signed and value > self._max:
+            value -= 1 << self.width
+        return self.kind(value)
+
+    def __set__(self, instance, value):
+        value = index(value)
+        if not self._min <= value <= self._max:
+            raise ValueError('{} does not fit in {}-bit field {!r} (allowed range: {}..{})'.format(
+                value, self.width, self.dataclass_field, self._min, self._max))
+
+        bits = getattr(instance, self.slot_name, 0) & ~(self._mask << self._shift)
+        object.__setattr__(instance, self.slot_name, bits | ((value & self._mask) << self._shift))
+
+
+class Categories:
+    """
+    Value dictionary of categorical fields. Values (hashable, equal values share one code) are encoded as consecutive
+    integers in order of appearance. One instance can be shared by many fields (e.g. one dictionary per class).
+    """
+
+    __slots__ = ('values', '_codes')
+
+    def __init__(self, values: Iterable[Any] = ()):
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value: Any) -> int:
+        try:
+            return self._codes[value]
+        except KeyError:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+            return code
+
+    def decode(self, code: int) -> Any:
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__qualname__, self.values)
+
+
+class Categorical(DataslotsDescriptor):
+    """
+    Data descriptor storing integer code of value (dictionary encoding). Reads return the original value object from
+    categories, so all instances share it. If categories are not provided, field has its own dictionary.
+
+    Bulk paths (RecordBatch, columnar, stream) read and write codes directly, pickled instances contain values.
+    """
+
+    __slots__ = ('categories', 'default')
+
+    def __init__(self, categories: Optional[Categories] = None, *, default: Any = MISSING):
+        self.categories = Categories() if categories is None else categories
+        self.default = default
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            if self.default is MISSING:
+                raise AttributeError(self.dataclass_field)
+            return self.default
+        return self.categories.values[self.get_value(instance)]
+
+    def __set__(self, instance, value):
+        # object.__setattr__ is used to support frozen dataclasses (like in BitField)
+        object.__setattr__(instance, self.slot_name, self.categories.encode(value))
+
+    def get_code(self, instance) -> int:
+        return self.get_value(instance)
+
+
+def _rebuild_batch(cls: type, names: Tuple[str, ...], size: int, values: List[Any],
+                   categories: Optional[Dict[str, List[Any]]] = None) -> RecordBatch:
+    for name, pickled_values in (categories or {}).items():
+        # Codes from other process are translated to codes of local categories
+        codes = list(map(getattr_static(cls, name).categories.encode, pickled_values))
+        column = names.index(name)
+        values[column::len(names)] = [codes[code] for code in values[column::len(names)]]
+
+    rows = zip(*[iter(values)] * len(names)) if names else repeat((), size)
+    return RecordBatch(_record_builder(cls, names)(rows), cls)
+
+
+class RecordBatch(Sequence):
+    """
+    List of instances of one dataclass with compact pickle format: class and field names are written once, followed
+    by flat list of field values. On load instances are rebuilt with generated code (__init__ is not called).
+    Only dataclass fields are stored (all of them must be set), other instance attributes are skipped. Categorical
+    fields are stored as codes with used categories written once.
+    """
+
+    __slots__ = ('cls', 'records')
+
+    def __init__(self, records: Iterable[Any], cls: Optional[type] = None):
+        records = list(records)
+        if cls is None:
+            if not records:
+                raise ValueError('cls is required to create empty batch')
+            cls = type(records[0])
+
+        if not is_dataclass(cls):
+            raise TypeError('RecordBatch can be used only with dataclass')
+        if any(type(record) is not cls for record in records):
+            raise TypeError('all records must be instances of {}'.format(cls.__qualname__))
+
+        self.cls = cls
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, item):
+        return self.records[item]
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.cls, self.records) == (other.cls, other.records)
+
+    def __repr__(self):
+        return '{}({!r}, cls={})'.format(self.__class__.__qualname__, self.records, self.cls.__qualname__)
+
+    def __reduce__(self):
+        names = tuple(field.name for field in fields(self.cls))
+        categorical = {descriptor.dataclass_field: descriptor for descriptor in _categorical_slots(self.cls).values()}
+        attributes = tuple(categorical[name].slot_name if name in categorical else name for name in names)
+        values = _record_values(attributes)(self.records)
+        args: Tuple[Any, ...] = (self.cls, names, len(self.records), values)
+        if categorical:
+            used: Dict[str, List[Any]] = {}
+            for name, descriptor in categorical.items():
+                # Codes are renumbered, so only categories used in batch are written
+                column = names.index(name)
+                codes = {code: i for i, code in enumerate(dict.fromkeys(values[column::len(names)]))}
+                values[column::len(names)] = [codes[code] for code in values[column::len(names)]]
+                used[name] = [descriptor.categories.values[code] for code in codes]
+            args += (used,)
+        return _rebuild_batch, args
+
+
+@_cached_per_class
+def _slots_cleaner(cls: type) -> Callable[[Any], None]:
+    """
+    Generate function unsetting all slots (and clearing __dict__) of instance, so released instance does not keep
+    references to field values.
+    """
+    local_vars: Dict[str, Any] = {}
+    body = []
+    for i, slot in enumerate(_slotnames(cls)):
+        local_vars[f'_del_{i}'] = getattr_static(cls, slot).__delete__
+        body += ['try:',
+                 f'  _del_{i}(_obj)',
+                 'except AttributeError:',
+                 '  pass']
+    if cls.__dictoffset__:
+        body.append('_obj.__dict__.clear()')
+    return _create_fn('_clear_slots', ['_obj'], body or ['pass'], local_vars=local_vars)
+
+
+def _released_class(cls: type) -> type:
+    """
+    Create subclass (with the same layout) assigned to released instances in debug mode, any attribute access raises
+    RuntimeError.
+    """
+    def error(self, *args):
+        raise RuntimeError('instance of {} was released to pool'.format(cls.__qualname__))
+
+    released = type(cls)(cls.__name__, (cls,), {'__slots__': (), '__getattribute__': error, '__setattr__': error,
+                                                '__delattr__': error})
+    released.__qualname__ = cls.__qualname__ + '<released>'
+    return released
+
+
+def _generated_init(cls) -> bool:
+    """
+    Check if __init__ of cls is generated by dataclass for its own fields (not defined by user or inherited).
+    """
+    init = cls.__dict__.get('__init__')
+    code = getattr(init, '__code__', None)
+    return (cls.__dataclass_params__.init and isinstance(code, CodeType) and code.co_filename == '<string>' and
+            not any(field._field_type is _FIELD_INITVAR for field in cls.__dataclass_fields__.values()))
+
+
+def _acquire_fn(cls, pop: Callable[[], Any], debug: bool) -> Callable[..., Any]:
+    """
+    Generate acquire function of Pool with the same parameters as dataclass __init__. Reused instance is initialised
+    with the same assignments as in __init__ (fields which are not assigned by __init__ are unset), so arguments are
+    not forwarded. Instances of classes with custom __init__ or InitVar fields are reinitialised with __init__.
+    """
+    local_vars: Dict[str, Any] = {'_cls': cls, '_pop': pop, '_setattr': object.__setattr__,
+                                  '_delattr': object.__delattr__, '_init': cls.__init__, '_HAS_FACTORY': _HAS_FACTORY}
+    cls_fields = fields(cls)
+    if not _generated_init(cls) or any(field.name in local_vars or field.name == '_obj' for field in cls_fields):
+        args, call, init = ['*args', '**kwargs'], '*args, **kwargs', ['_init(_obj, *args, **kwargs)']
+    else:
+        frozen = cls.__dataclass_params__.frozen
+        args, kw_args, call_args, kw_call_args, init = [], [], [], [], []
+        for field in cls_fields:
+            if field.default_factory is not MISSING:
+                local_vars[f'_factory_{field.name}'] = field.default_factory
+                value = f'_factory_{field.name}()'
+                if field.init:
+                    value = f'{value} if {field.name} is _HAS_FACTORY else {field.name}'
+            elif field.init:
+                value = field.name
+            else:
+                # Not assigned by __init__ (value of reused instance is unset)
+                init += ['try:',
+                         f'  _delattr(_obj, {field.name!r})',
+                         'except AttributeError:',
+                         '  pass']
+                continue
+            init.append(f'_setattr(_obj, {field.name!r}, {value})' if frozen else f'_obj.{field.name} = {value}')
+
+            if field.init:
+                param = field.name
+                if field.default is not MISSING:
+                    local_vars[f'_dflt_{field.name}'] = field.default
+                    param = f'{field.name}=_dflt_{field.name}'
+                elif field.default_factory is not MISSING:
+                    param = f'{field.name}=_HAS_FACTORY'
+                if getattr(field, 'kw_only', False):  # pragma: no cover (python < 3.10)
+                    kw_args.append(param)
+                    kw_call_args.append(f'{field.name}={field.name}')
+                else:
+                    args.append(param)
+                    call_args.append(field.name)
+        if kw_args:  # pragma: no cover (python < 3.10)
+            args += ['*'] + kw_args
+        call = ', '.join(call_args + kw_call_args)
+        if hasattr(cls, _TRACKED_FIELDS):
+            init.insert(0, f'_setattr(_obj, {_CHANGES_SLOT!r}, 0)')
+        if cls.__dictoffset__:
+            init.insert(0, '_obj.__dict__.clear()')
+        if hasattr(cls, '__post_init__'):
+            init.append('_obj.__post_init__()')
+
+    body = ['try:',
+            '  _obj = _pop()',
+            'except IndexError:',
+            f'  return _cls({call})']
+    if debug:
+        body.append("_setattr(_obj, '__class__', _cls)")
+    body += init + ['return _obj']
+    return _create_fn('acquire', args, body, local_vars=local_vars)
+
+
+class Pool:
+    """
+    Bounded freelist of dataclass instances. acquire is generated for the class and takes the same arguments as class
+    constructor: reused instance is reinitialised with the same assignments as in dataclass __init__. Released
+    instances keep references to field values until they are acquired again, with clear=True references are dropped
+    on release (slower).
+
+    With debug=True released instances raise RuntimeError on any attribute access (class of instance is changed until
+    it's acquired again) and releasing instance twice raises ValueError.
+    """
+
+    __slots__ = ('cls', 'maxsize', 'debug', 'acquire', '_free', '_clear', '_released_cls')
+
+    acquire: Callable[..., Any]
+
+    def __init__(self, cls: type, *, maxsize: int = 1024, clear: bool = False, debug: bool = False):
+        if not is_dataclass(cls):
+            raise TypeError('Pool can be used only with dataclass')
+
+        self.cls = cls
+        self.maxsize = maxsize
+        self.debug = debug
+        self._free: List[Any] = []
+        self._clear = _slots_cleaner(cls) if clear else None
+        self._released_cls = _released_class(cls) if debug else None
+        self.acquire = _acquire_fn(cls, self._free.pop, debug)
+
+    def release(self, obj: Any) -> None:
+        if type(obj) is not self.cls:
+            if type(obj) is self._released_cls:
+                raise ValueError('instance of {} is already released'.format(self.cls.__qualname__))
+            raise TypeError('pool of {} cannot release {!r}'.format(self.cls.__qualname__, type(obj).__qualname__))
+
+        if self._clear is not None:
+            self._clear(obj)
+        if self._released_cls is not None:
+            object.__setattr__(obj, '__class__', self._released_cls)
+        if len(self._free) < self.maxsize:
+            self._free.append(obj)
+
+    def __len__(self):
+        return len(self._free)
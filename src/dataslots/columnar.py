@@ -0,0 +1,236 @@
+"""
+Bulk conversion between dataclass instances and NumPy structured arrays.
+Requires numpy (``pip install dataslots[numpy]``).
+"""
+from __future__ import annotations
+
+from dataclasses import fields, is_dataclass, Field, MISSING
+from functools import lru_cache
+from inspect import getattr_static
+from itertools import repeat
+from struct import Struct, error as StructError
+from typing import get_type_hints, Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar
+
+import numpy as np
+
+from dataslots import BitField, Categorical, _cached_per_class, _create_fn, _record_builder
+
+__all__ = ['numpy_dtype', 'to_numpy', 'from_numpy']
+
+DC = TypeVar('DC')
+
+# Field metadata key used to override derived dtype, e.g. field(metadata={'dtype': 'U16'})
+DTYPE_METADATA = 'dtype'
+
+# Order matters: bool is subclass of int
+_DTYPES = {bool: '?', int: 'i8', float: 'f8', complex: 'c16'}
+
+# Struct format codes (standard size) for dtypes (kind and size) which can be packed directly to array buffer
+# (bool is packed as unsigned byte, so non-bool values are not converted silently, values other than 0 and 1 are
+# rejected after packing)
+_STRUCT_CODES = {
+    ('b', 1): 'B',
+    ('i', 1): 'b', ('i', 2): 'h', ('i', 4): 'i', ('i', 8): 'q',
+    ('u', 1): 'B', ('u', 2): 'H', ('u', 4): 'I', ('u', 8): 'Q',
+    ('f', 4): 'f', ('f', 8): 'd',
+}
+
+
+def _bit_field_dtype(descriptor: BitField) -> str:
+    if descriptor.kind is bool:
+        return '?'
+    for size in (1, 2, 4, 8):
+        if descriptor.width <= size * 8:
+            return ('i' if descriptor.signed else 'u') + str(size)
+    return 'O'
+
+
+def _field_dtype(cls: type, field: Field, hints: Dict[str, Any]) -> Any:
+    if DTYPE_METADATA in field.metadata:
+        return field.metadata[DTYPE_METADATA]
+
+    descriptor = getattr_static(cls, field.name, None)
+    if isinstance(descriptor, BitField):
+        return _bit_field_dtype(descriptor)
+    if isinstance(descriptor, Categorical):
+        return 'i4'
+
+    hint = hints.get(field.name, field.type)
+    if isinstance(hint, type):
+        for tp, dtype in _DTYPES.items():
+            if issubclass(hint, tp):
+                return dtype
+    return 'O'
+
+
+@_cached_per_class
+def numpy_dtype(cls: type) -> np.dtype:
+    """
+    Derive structured dtype from dataclass fields. Types are mapped as follows: bool -> ?, int -> i8, float -> f8,
+    complex -> c16 and others (str, bytes, ...) -> object. BitField uses the smallest integer type that fits and
+    Categorical is stored as i4 code. Use field metadata with 'dtype' key to override derived type (e.g. to store str
+    as fixed-length unicode).
+    """
+    if not is_dataclass(cls):
+        raise TypeError('numpy_dtype can be used only with dataclass')
+
+    try:
+        hints = get_type_hints(cls)
+    except NameError:
+        hints = {}
+    return np.dtype([(field.name, _field_dtype(cls, field, hints)) for field in fields(cls)])
+
+
+def _attributes(cls: type, names: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Attributes with column values (slots with codes are read directly for categorical fields).
+    """
+    descriptors = [getattr_static(cls, name, None) for name in names]
+    return tuple(descriptor.slot_name if isinstance(descriptor, Categorical) else name
+                 for name, descriptor in zip(names, descriptors))
+
+
+@lru_cache(maxsize=128)
+def _rows_packer(dtype: np.dtype, attributes: Tuple[str, ...]) -> Optional[Callable[[Sequence[Any]], bytearray]]:
+    """
+    Generate function packing attributes of instances into buffer with dtype layout. Returns None if some column
+    cannot be packed with struct module (e.g. objects, fixed-length strings or non-native byte order).
+    """
+    codes = []
+    for name in dtype.names or ():
+        column_dtype = dtype[name]
+        code = _STRUCT_CODES.get((column_dtype.kind, column_dtype.itemsize))
+        if code is None or column_dtype.byteorder not in '=|':
+            return None
+        codes.append(code)
+
+    args = ', '.join(f'_obj.{name}' for name in attributes)
+    return _create_fn('_pack_rows', ['_instances'], [f'return _join([_pack({args}) for _obj in _instances])'],
+                      local_vars={'_pack': Struct('=' + ''.join(codes)).pack, '_join': bytearray().join})
+
+
+@lru_cache(maxsize=128)
+def _columns_getter(names: Tuple[str, ...]) -> Callable[[Sequence[Any]], Tuple[List[Any], ...]]:
+    """
+    Generate function returning list of values for each attribute in names.
+    """
+    columns = ''.join(f'[_obj.{name} for _obj in _instances], ' for name in names)
+    return _create_fn('_get_columns', ['_instances'], [f'return ({columns})'], local_vars={})
+
+
+def _check_range(name: str, column: Any, column_dtype: np.dtype) -> None:
+    if column_dtype.kind == 'b':
+        low, high = 0, 1
+    else:
+        info = np.iinfo(column_dtype)
+        low, high = info.min, info.max
+    if column.min() < low or column.max() > high:
+        raise ValueError('values of field {!r} are out of range of {} ({}..{})'.format(name, column_dtype, low, high))
+
+
+def _column(name: str, values: List[Any], column_dtype: np.dtype) -> Any:
+    """
+    Convert values of numeric column, values are never changed silently (numpy casting would drop fractional or
+    imaginary parts, wrap integers and convert any value to bool).
+    """
+    if column_dtype.kind not in 'biufc' or not values:
+        return values
+    column = np.asarray(values)
+    if column_dtype.kind in 'biu':
+        if column.dtype.kind not in 'biu':
+            # Integers which do not fit in int64 are converted to float64 or object array
+            if not all(isinstance(value, int) for value in values):
+                raise ValueError('values of field {!r} ({}) cannot be stored as {} without loss'.format(
+                    name, column.dtype, column_dtype))
+            column = np.asarray(values, dtype=object)
+        if column.dtype.kind != 'b':
+            _check_range(name, column, column_dtype)
+    elif column.dtype.kind in 'fc' and not np.can_cast(column.dtype, column_dtype, casting='same_kind'):
+        raise ValueError('values of field {!r} ({}) cannot be stored as {} without loss'.format(
+            name, column.dtype, column_dtype))
+    return column
+
+
+def to_numpy(instances: Sequence[Any], cls: Optional[type] = None) -> np.ndarray:
+    """
+    Convert instances of dataclass to structured array. If all columns are numeric, instances are packed directly
+    into array buffer, otherwise values are collected column by column and each column is converted by numpy at
+    once (both with generated code). Codes of categorical fields are exported. If the sequence may be empty, cls must
+    be provided.
+
+    ValueError is raised if value does not match column type (e.g. float value of integer field, integer out of range
+    or value other than bool, 0 and 1 in bool field).
+    """
+    if cls is None:
+        if not instances:
+            raise ValueError('cls is required to convert empty sequence')
+        cls = type(instances[0])
+
+    dtype = numpy_dtype(cls)
+    names = dtype.names or ()
+    attributes = _attributes(cls, names)
+    packer = _rows_packer(dtype, attributes)
+    if packer is not None:
+        try:
+            array = np.frombuffer(packer(instances), dtype=dtype)
+        except StructError as exc:
+            msg = 'instances of {} cannot be stored as {}: {}'.format(cls.__qualname__, dtype, exc)
+            raise ValueError(msg) from exc
+        for name in names:
+            if dtype[name].kind == 'b' and len(array):
+                _check_range(name, array[name].view(np.uint8), dtype[name])
+        return array
+
+    array = np.empty(len(instances), dtype=dtype)
+    for name, values in zip(names, _columns_getter(attributes)(instances)):
+        array[name] = _column(name, values, dtype[name])
+    return array
+
+
+def _default_columns(cls: type, names: Tuple[str, ...]) -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    Factories of values for fields missing in array (codes for categorical fields).
+    """
+    columns: List[Tuple[str, Callable[[], Any]]] = []
+    required = []
+    for field in fields(cls):
+        if field.name in names:
+            continue
+        if field.default is not MISSING:
+            default = field.default
+            descriptor = getattr_static(cls, field.name, None)
+            if isinstance(descriptor, Categorical):
+                default = descriptor.categories.encode(default)
+            columns.append((field.name, repeat(default).__next__))
+        elif field.default_factory is not MISSING:
+            columns.append((field.name, field.default_factory))
+        else:
+            required.append(field.name)
+
+    if required:
+        raise ValueError('array has no columns for fields of {} without default: {}'.format(
+            cls.__qualname__, ', '.join(required)))
+    return columns
+
+
+def from_numpy(array: np.ndarray, cls: Type[DC]) -> List[DC]:
+    """
+    Create instances of cls from structured array. Each array column must match a field of cls and all fields without
+    default must be present (missing fields are set to their defaults). Like unpickling, __init__ is not called and
+    values are assigned directly.
+    """
+    names = array.dtype.names
+    if names is None:
+        raise TypeError('structured array is required')
+
+    unknown = set(names).difference(field.name for field in fields(cls))  # type: ignore
+    if unknown:
+        raise ValueError('array columns are not fields of {}: {}'.format(cls.__qualname__, ', '.join(sorted(unknown))))
+
+    rows = array.tolist()
+    defaults = _default_columns(cls, names)
+    if defaults:
+        factories = [factory for _, factory in defaults]
+        rows = [row + tuple(factory() for factory in factories) for row in rows]
+        names += tuple(name for name, _ in defaults)
+    return _record_builder(cls, names)(rows)
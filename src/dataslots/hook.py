@@ -0,0 +1,256 @@
+"""
+Import hook applying dataslots to dataclasses defined in selected packages.
+"""
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from abc import ABCMeta
+from dataclasses import fields
+from dis import get_instructions
+from importlib.abc import Loader, MetaPathFinder
+from inspect import isdatadescriptor, getattr_static, unwrap
+from types import CodeType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from dataslots import dataslots, BitField, DataDescriptor, _PACKED_SLOT, _inherited_slots, _lookup
+
+__all__ = ['install', 'ImportHook', 'ConversionReport']
+
+
+class ConversionReport(NamedTuple):
+    """
+    Result of dataclass inspection done by import hook. Reason is set if class cannot be converted safely,
+    estimated_saving is approximate number of bytes saved per instance (measured in dry run only, None otherwise and
+    for classes which cannot be converted).
+    """
+    module: str
+    qualname: str
+    converted: bool
+    reason: Optional[str]
+    estimated_saving: Optional[int]
+
+
+def _class_functions(cls) -> Iterator[Any]:
+    for value in cls.__dict__.values():
+        if isinstance(value, (classmethod, staticmethod)):
+            value = value.__func__
+        for candidate in (value.fget, value.fset, value.fdel) if isinstance(value, property) else (value,):
+            if candidate is None:
+                continue
+            candidate = unwrap(candidate)
+            if isinstance(getattr(candidate, '__code__', None), CodeType):
+                yield candidate
+
+
+def _code_objects(code: CodeType) -> Iterator[CodeType]:
+    yield code
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _code_objects(const)
+
+
+# Names of descriptor types (also base types) which store values in instance __dict__
+_DICT_DESCRIPTORS = frozenset({'cached_property'})
+
+# Instructions which refer to attributes (or to vars builtin)
+_ATTRIBUTE_OPS = {'LOAD_ATTR', 'LOAD_METHOD', 'STORE_ATTR', 'DELETE_ATTR', 'LOAD_GLOBAL'}
+
+
+def _undeclared_attributes(cls, names: List[str]) -> List[str]:
+    """
+    Find attributes assigned in class methods which are neither fields nor data descriptors (__dict__ is reported if
+    it is used directly or with vars). Any object attributes are taken into account, so result may be overestimated.
+    """
+    allowed = set(names)
+    allowed.update(name for name in dir(cls) if isdatadescriptor(getattr_static(cls, name)))
+    allowed.discard('__dict__')
+
+    found: Dict[str, None] = {}
+    for function in _class_functions(cls):
+        for code in _code_objects(function.__code__):
+            for instruction in get_instructions(code):
+                if instruction.opname not in _ATTRIBUTE_OPS:
+                    continue
+                name = instruction.argval
+                if name == '__dict__' or (instruction.opname, name) == ('LOAD_GLOBAL', 'vars'):
+                    found['__dict__'] = None
+                elif instruction.opname == 'STORE_ATTR' and name not in allowed:
+                    found[name] = None
+    return list(found)
+
+
+def _conversion_problem(cls, names: List[str], namespace: Dict[str, Any]) -> Optional[str]:
+    if '__slots__' in cls.__dict__:
+        return 'class already has __slots__'
+    if type(cls) not in (type, ABCMeta):
+        return 'custom metaclass {}'.format(type(cls).__name__)
+    subclasses = cls.__subclasses__()
+    if subclasses:
+        return 'class has subclasses: {}'.format(', '.join(sub.__qualname__ for sub in subclasses))
+    for base in cls.__mro__[1:-1]:
+        if '__slots__' not in base.__dict__:
+            return 'base class {} has no __slots__'.format(base.__qualname__)
+    cached = [name for klass in cls.__mro__[:-1] for name, value in klass.__dict__.items()
+              if any(tp.__name__ in _DICT_DESCRIPTORS for tp in type(value).__mro__)]
+    if cached:
+        return 'class uses descriptors which store values in __dict__: {}'.format(', '.join(cached))
+    if any(type(value) is cls for value in namespace.values()):
+        return 'instances are created during module import'
+    attributes = _undeclared_attributes(cls, names)
+    if attributes:
+        return 'methods use attributes which are not fields: {}'.format(', '.join(attributes))
+    return None
+
+
+def _slots_probe(cls, names: List[str]) -> type:
+    """
+    Create class with the same instance layout as cls converted by import hook (slots of bases and fields,
+    __weakref__), without binding descriptors of cls.
+    """
+    mro = cls.__mro__
+    slots = _inherited_slots(mro[1:])
+    for name in names:
+        descriptor = _lookup(mro, name)
+        if isinstance(descriptor, BitField):
+            slots.add(descriptor.slot_name if descriptor.is_bound else _PACKED_SLOT)
+        elif isinstance(descriptor, DataDescriptor):
+            slots.add(descriptor.slot_name)
+        elif not isdatadescriptor(descriptor):
+            slots.add(name)
+    slots.add('__weakref__')
+    return type('Probe', (), {'__slots__': tuple(slots)})
+
+
+def _allocated_size(create: Callable[[], Any], count: int = 100) -> int:
+    """
+    Average number of bytes allocated by create (e.g. instance with its __dict__), measured with tracemalloc.
+    """
+    def allocate() -> List[Any]:
+        return [create() for _ in range(count)]
+
+    allocate()  # warm up, e.g. keys shared by __dict__ of all instances are allocated with the first instance
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = allocate()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    del objects
+    return size // count
+
+
+def _estimate_saving(cls, slotted: Any, names: List[str]) -> Optional[int]:
+    """
+    Compare memory allocated by instances of cls (with fields set in __dict__) and instances of slotted class. None
+    is returned if instances cannot be created without arguments (custom __new__).
+    """
+    in_dict = [name for name in names if not isdatadescriptor(getattr_static(cls, name, None))]
+
+    def with_dict():
+        obj = cls.__new__(cls)
+        for name in in_dict:
+            object.__setattr__(obj, name, None)
+        return obj
+
+    try:
+        return _allocated_size(with_dict) - _allocated_size(lambda: slotted.__new__(slotted))
+    except TypeError:
+        return None
+
+
+class _SlotsLoader(Loader):
+    """
+    Wrapper of module loader which passes executed module to import hook.
+    """
+
+    def __init__(self, loader: Any, hook: ImportHook):
+        self.loader = loader
+        self.hook = hook
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.loader.exec_module(module)
+        self.hook.process_module(module)
+
+    def __getattr__(self, name: str):
+        return getattr(self.loader, name)
+
+
+class ImportHook(MetaPathFinder):
+    """
+    Import hook (created by install) applying dataslots to dataclasses defined in modules of selected packages.
+    """
+
+    def __init__(self, packages: Iterable[str], dry_run: bool = False):
+        if isinstance(packages, str):
+            raise TypeError('packages must be iterable of package names')
+        self.packages = tuple(packages)
+        self.dry_run = dry_run
+        self.reports: List[ConversionReport] = []
+
+    def find_spec(self, fullname, path, target=None):
+        if not any(fullname == package or fullname.startswith(package + '.') for package in self.packages):
+            return None
+
+        finders = [finder for finder in sys.meta_path if finder is not self and hasattr(finder, 'find_spec')]
+        for finder in finders:
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _SlotsLoader(spec.loader, self)
+                return spec
+        return None
+
+    def process_module(self, module) -> None:
+        """
+        Convert (or only inspect in dry run) dataclasses defined in module, names bound to converted classes are
+        updated in module namespace.
+        """
+        namespace = vars(module)
+        classes = {id(value): value for value in namespace.values()
+                   if isinstance(value, type) and value.__module__ == module.__name__
+                   and '__dataclass_fields__' in value.__dict__}
+
+        for cls in classes.values():
+            names = [f.name for f in fields(cls)]
+            reason = _conversion_problem(cls, names, namespace)
+            if reason is not None:
+                self.reports.append(ConversionReport(module.__name__, cls.__qualname__, False, reason, None))
+                continue
+
+            saving: Optional[int] = None
+            if self.dry_run:
+                saving = _estimate_saving(cls, _slots_probe(cls, names), names)
+            else:
+                slotted: type = dataslots(add_weakref=True)(cls)
+                for name, value in list(namespace.items()):
+                    if value is cls:
+                        namespace[name] = slotted
+            self.reports.append(ConversionReport(module.__name__, cls.__qualname__, not self.dry_run, None, saving))
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+
+def install(packages: Iterable[str], *, dry_run: bool = False) -> ImportHook:
+    """
+    Install import hook which applies dataslots (with __weakref__ slot) to dataclasses defined in given packages (and
+    their subpackages) imported afterwards. Classes which cannot be converted safely (e.g. with subclasses, bases
+    without __slots__, cached_property, methods assigning undeclared attributes) are skipped. Each inspected class is
+    reported in hook.reports, with dry_run=True classes are only inspected (and memory saving is estimated).
+
+    Methods are inspected statically, so attributes assigned dynamically (e.g. setattr with non-field name) are not
+    detected. Other references to original class created during import of its module (e.g. registries, default
+    factories) are not updated.
+    """
+    hook = ImportHook(packages, dry_run)
+    sys.meta_path.insert(0, hook)
+    return hook
@@ -0,0 +1,147 @@
+"""
+Asynchronous decoding of fixed-layout binary records into dataclass instances.
+"""
+from __future__ import annotations
+
+from asyncio import IncompleteReadError
+from dataclasses import fields, is_dataclass, Field
+from inspect import getattr_static
+from struct import Struct
+from typing import get_type_hints, Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Tuple, Type, TypeVar, Union
+
+from dataslots import BitField, Categorical, _cached_per_class, _record_builder
+
+__all__ = ['struct_layout', 'iter_batches', 'iter_records']
+
+DC = TypeVar('DC')
+
+# Field metadata key used to define (or override derived) struct format, e.g. field(metadata={'struct': '16s'})
+STRUCT_METADATA = 'struct'
+
+# Order matters: bool is subclass of int
+_FORMATS = {bool: '?', int: 'q', float: 'd'}
+
+
+def _bit_field_format(descriptor: BitField) -> str:
+    if descriptor.kind is bool:
+        return '?'
+    for size, code in ((8, 'b'), (16, 'h'), (32, 'i'), (64, 'q')):
+        if descriptor.width <= size:
+            return code if descriptor.signed else code.upper()
+    raise TypeError('BitField {!r} is too wide for struct layout'.format(descriptor.dataclass_field))
+
+
+def _field_format(cls: type, field: Field, hints: Dict[str, Any]) -> str:
+    if STRUCT_METADATA in field.metadata:
+        return field.metadata[STRUCT_METADATA]
+
+    descriptor = getattr_static(cls, field.name, None)
+    if isinstance(descriptor, BitField):
+        return _bit_field_format(descriptor)
+    if isinstance(descriptor, Categorical):
+        return 'i'
+
+    hint = hints.get(field.name, field.type)
+    if isinstance(hint, type):
+        for tp, code in _FORMATS.items():
+            if issubclass(hint, tp):
+                return code
+    raise TypeError('field {!r} has no fixed-size layout, define it with field metadata {{{!r}: ...}}'.format(
+        field.name, STRUCT_METADATA))
+
+
+@_cached_per_class
+def struct_layout(cls: type, byteorder: str = '<') -> Struct:
+    """
+    Derive struct layout (standard sizes, no padding) from dataclass fields: bool -> ?, int -> q (int64),
+    float -> d (double), BitField -> the smallest integer that fits, Categorical -> i (code). Other fields (e.g. bytes)
+    require format in field metadata with 'struct' key, which can be used to override derived format too.
+    """
+    if not is_dataclass(cls):
+        raise TypeError('struct_layout can be used only with dataclass')
+    if byteorder not in ('<', '>', '!', '='):
+        raise ValueError('byteorder must be one of: <, >, !, =')
+
+    try:
+        hints = get_type_hints(cls)
+    except NameError:
+        hints = {}
+    return Struct(byteorder + ''.join(_field_format(cls, field, hints) for field in fields(cls)))
+
+
+def _decoder(cls: type, byteorder: str) -> Tuple[int, Callable[[bytes], List[Any]]]:
+    layout = struct_layout(cls, byteorder)
+    build = _record_builder(cls, tuple(field.name for field in fields(cls)))
+
+    def decode(data: bytes) -> List[Any]:
+        return build(layout.iter_unpack(data))
+
+    return layout.size, decode
+
+
+async def _read_chunks(source: Any, record_size: int, batch_size: int) -> AsyncIterator[bytes]:
+    """
+    Yield chunks of data as soon as whole records are available (up to batch_size records per chunk). Only the last
+    chunk may end with incomplete record.
+    """
+    size = record_size * batch_size
+    if hasattr(source, 'readexactly'):
+        while True:
+            # read returns data which is already buffered (waits only if there's none)
+            data = await source.read(size)
+            if not data:
+                return
+            incomplete = len(data) % record_size
+            if incomplete:
+                # Whole records are decoded right away, only the trailing one is completed
+                if len(data) > incomplete:
+                    yield data[:-incomplete]
+                    data = data[-incomplete:]
+                try:
+                    data += await source.readexactly(record_size - incomplete)
+                except IncompleteReadError as exc:
+                    data += exc.partial  # stream ended, next read returns no data
+            yield data
+
+    buffer = bytearray()
+    async for data in source:  # pragma: no branch (exit of async for is not traced on python 3.9)
+        buffer += data
+        end = len(buffer) - len(buffer) % record_size
+        if end:
+            with memoryview(buffer) as view:
+                for start in range(0, end, size):
+                    yield bytes(view[start:min(start + size, end)])
+            del buffer[:end]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def iter_batches(source: Union[Any, AsyncIterable[bytes]], cls: Type[DC], *, batch_size: int = 1024,
+                       byteorder: str = '<') -> AsyncIterator[List[DC]]:
+    """
+    Decode records from asyncio.StreamReader or any async iterable of bytes chunks and yield lists of up to batch_size
+    instances. Records are decoded as soon as they are received (batch is not delayed until batch_size records are
+    available) and data is read only when next batch is requested, so at most one batch (plus one chunk for iterables)
+    is kept in memory. Instances are created without calling __init__.
+
+    ValueError is raised if stream ends in the middle of record.
+    """
+    if batch_size < 1:
+        raise ValueError('batch_size must be positive')
+
+    record_size, decode = _decoder(cls, byteorder)
+    async for data in _read_chunks(source, record_size, batch_size):  # pragma: no branch (python 3.9)
+        incomplete = len(data) % record_size
+        if incomplete:
+            raise ValueError('stream ended in the middle of record ({} of {} bytes)'.format(incomplete, record_size))
+        yield decode(data)
+
+
+async def iter_records(source: Union[Any, AsyncIterable[bytes]], cls: Type[DC], *, batch_size: int = 1024,
+                       byteorder: str = '<') -> AsyncIterator[DC]:
+    """
+    Same as iter_batches, but yields single instances (records are still read and decoded in batches).
+    """
+    async for batch in iter_batches(source, cls, batch_size=batch_size, byteorder=byteorder):
+        for record in batch:
+            yield record
@@ -1,5 +1,6 @@
 import weakref
-from dataclasses import field
+from dataclasses import field, fields, FrozenInstanceError, InitVar
+from typing import ClassVar, ClassVar as CV
 
 import pytest
 from dataslots import dataclass
@@ -41,3 +42,71 @@ def test_raise(assertions):
     with pytest.raises(TypeError) as exc_info:
         dataclass(slots=False)(A)
     assert exc_info.match('slots is False, use dataclasses.dataclass instead')
+
+
+def test_slots_already_defined():
+    class A:
+        __slots__ = ('x',)
+        x: int
+
+    with pytest.raises(TypeError) as exc_info:
+        dataclass(slots=True)(A)
+    assert exc_info.match('do not define __slots__ if dataslots decorator is used')
+
+
+def test_no_intermediate_dataclass(assertions):
+    @dataclass(slots=True, frozen=True)
+    class A:
+        x: int
+        y: int = 5
+
+    instance = A(1)
+    assertions.assert_slots(A, ('x', 'y'))
+    assert A.__dataclass_fields__['y'].default == 5
+    with pytest.raises(FrozenInstanceError):
+        instance.z = 10  # type: ignore
+
+
+def test_defaults_of_inherited_slots(assertions):
+    @dataclass(slots=True)
+    class A:
+        x: int
+        y: list = field(default_factory=list)
+
+    @dataclass(slots=True)
+    class B(A):
+        x: int = 5
+        y: list = field(default_factory=lambda: [1])
+        z: int = 10
+
+    assertions.assert_slots(B, ('z',))
+    assert B() == B(5, [1], 10)
+    assert A(1).y == []
+    assert type(B.__dict__.get('x', None)) is not int
+
+
+def test_unpredictable_fields(assertions):
+    @dataclass(slots=True)
+    class A:
+        x: int
+        y: 'CV[int]' = 5
+
+    assertions.assert_slots(A, ('x',))
+    assert [f.name for f in fields(A)] == ['x']
+    assert A(1).y == 5
+
+
+def test_pseudo_fields(assertions):
+    @dataclass(slots=True)
+    class A:
+        x: int
+        y: ClassVar[int] = 1
+        z: 'ClassVar[int]' = 2
+        v: InitVar[int] = 3
+
+        def __post_init__(self, v):
+            self.x += v
+
+    assertions.assert_slots(A, ('x',))
+    assert [f.name for f in fields(A)] == ['x']
+    assert (A(1).x, A.y, A.z) == (4, 1, 2)
@@ -0,0 +1,136 @@
+import gc
+import pickle
+import weakref
+from dataclasses import dataclass, field
+
+import pytest
+
+from dataslots import dataslots, RecordBatch, BitField, _record_builder
+
+
+@dataslots
+@dataclass
+class Record:
+    x: int
+    y: float = 0.5
+    tags: list = field(default_factory=list)
+
+
+@dataslots
+@dataclass(frozen=True)
+class FrozenRecord:
+    x: int
+    flag: bool = BitField(1, kind=bool, default=False)  # type: ignore
+    z: int = field(init=False, default_factory=int)
+
+
+@dataclass(frozen=True)
+class FrozenBase:
+    x: int
+
+
+@dataslots
+@dataclass(frozen=True)
+class FrozenDerived(FrozenBase):
+    y: int
+
+
+@dataslots
+@dataclass
+class Empty:
+    pass
+
+
+@dataclass(frozen=True)
+class WithoutSlots:
+    x: int
+
+
+@pytest.mark.parametrize('records', [
+    [Record(1), Record(2, 1.5, ['a']), Record(3, tags=['b', 'c'])],
+    [FrozenRecord(1, True), FrozenRecord(2)],
+    [FrozenDerived(1, 2), FrozenDerived(3, 4)],
+    [Empty(), Empty()],
+    [WithoutSlots(1), WithoutSlots(2)],
+])
+@pytest.mark.parametrize('pickle_protocol', [2, 3, 4])
+def test_pickle(records, pickle_protocol):
+    batch = RecordBatch(records)
+
+    pickled = pickle.loads(pickle.dumps(batch, protocol=pickle_protocol))
+
+    assert pickled == batch
+    assert list(pickled) == records
+    assert all(type(record) is type(records[0]) for record in pickled)
+
+
+def test_init_not_called():
+    record = FrozenRecord(5)
+    object.__setattr__(record, 'z', 10)
+
+    pickled, = pickle.loads(pickle.dumps(RecordBatch([record])))
+    assert pickled.z == 10
+
+
+def test_empty_batch():
+    batch = RecordBatch([], Record)
+    assert pickle.loads(pickle.dumps(batch)) == batch
+
+    with pytest.raises(ValueError) as exc_info:
+        RecordBatch([])
+    assert exc_info.match('cls is required to create empty batch')
+
+
+def test_smaller_payload():
+    records = [Record(i, i / 2) for i in range(1000)]
+    assert len(pickle.dumps(RecordBatch(records))) < len(pickle.dumps(records)) / 2
+
+
+def test_sequence():
+    records = [Record(1), Record(2)]
+    batch = RecordBatch(iter(records))
+
+    assert len(batch) == 2
+    assert batch[1] == Record(2)
+    assert batch[:1] == [Record(1)]
+    assert Record(2) in batch
+    assert batch != records
+    assert repr(batch) == "RecordBatch([Record(x=1, y=0.5, tags=[]), Record(x=2, y=0.5, tags=[])], cls=Record)"
+
+
+def test_not_homogeneous():
+    with pytest.raises(TypeError) as exc_info:
+        RecordBatch([Record(1), FrozenRecord(1)])
+    assert exc_info.match('all records must be instances of Record')
+
+
+def test_not_dataclass():
+    with pytest.raises(TypeError) as exc_info:
+        RecordBatch([1, 2])
+    assert exc_info.match('RecordBatch can be used only with dataclass')
+
+
+def test_generated_code_cached_per_class():
+    @dataslots
+    @dataclass
+    class A:
+        x: int
+
+    @dataslots
+    @dataclass
+    class B(A):
+        pass
+
+    build = _record_builder(A, ('x',))
+    assert _record_builder(A, ('x',)) is build
+    assert _record_builder(B, ('x',)) is not build
+    assert _record_builder(A, names=('x',)) is _record_builder(A, names=('x',))
+    assert _record_builder(int, ()) is not _record_builder(int, ())
+
+    _record_builder(WithoutSlots, ('x',))
+    assert '__dataslots_cache__' not in vars(dataslots(WithoutSlots))
+
+    ref = weakref.ref(A)
+    del A, B, build
+    gc.collect()
+    assert ref() is None
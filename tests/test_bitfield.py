@@ -0,0 +1,158 @@
+import pickle
+from dataclasses import dataclass, replace, astuple
+from enum import IntEnum
+from typing import ClassVar as CV
+
+import pytest
+
+from dataslots import dataslots, dataclass as dataslots_dataclass, BitField
+
+
+class Level(IntEnum):
+    DEBUG = 0
+    INFO = 1
+    WARNING = 2
+    ERROR = 3
+
+
+@dataslots
+@dataclass
+class Event:
+    code: int
+    urgent: bool = BitField(1, kind=bool)  # type: ignore
+    level: Level = BitField(2, kind=Level, default=Level.INFO)  # type: ignore
+    delta: int = BitField(4, signed=True, default=0)  # type: ignore
+
+
+@dataslots
+@dataclass(frozen=True)
+class FrozenEvent:
+    urgent: bool = BitField(1, kind=bool)  # type: ignore
+    level: Level = BitField(2, kind=Level, default=Level.INFO)  # type: ignore
+
+
+def test_shared_slot(assertions):
+    assertions.assert_slots(Event, ('code', '_dataslots_packed_0'))
+
+    event = Event(5, True, Level.ERROR, -3)
+    assert (event.code, event.urgent, event.level, event.delta) == (5, True, Level.ERROR, -3)
+    assert type(event.urgent) is bool
+    assert type(event.level) is Level
+    assert str(event).endswith('Event(code=5, urgent=True, level=<Level.ERROR: 3>, delta=-3)')
+
+
+def test_update_does_not_touch_other_fields():
+    event = Event(5, False)
+    assert (event.urgent, event.level, event.delta) == (False, Level.INFO, 0)
+
+    event.delta = -8
+    event.urgent = True
+    assert (event.urgent, event.level, event.delta) == (True, Level.INFO, -8)
+
+    event.level = Level.DEBUG
+    event.delta = 7
+    assert (event.urgent, event.level, event.delta) == (True, Level.DEBUG, 7)
+
+
+@pytest.mark.parametrize('args, msg', [
+    ((1, 2), r"2 does not fit in 1-bit field 'urgent' \(allowed range: 0..1\)"),
+    ((1, True, 4), r"4 does not fit in 2-bit field 'level' \(allowed range: 0..3\)"),
+    ((1, True, 0, -9), r"-9 does not fit in 4-bit field 'delta' \(allowed range: -8..7\)"),
+])
+def test_overflow(assertions, args, msg):
+    assertions.assert_init_raises(Event, *args, exception=ValueError, msg=msg)
+
+
+def test_not_integer():
+    with pytest.raises(TypeError):
+        Event(1, 'yes')  # type: ignore
+
+
+def test_invalid_width():
+    with pytest.raises(ValueError) as exc_info:
+        BitField(0)
+    assert exc_info.match('width must be positive integer')
+
+
+def test_eq_and_replace():
+    event = Event(1, True, Level.WARNING, 3)
+    assert event == Event(1, True, Level.WARNING, 3)
+    assert event != Event(1, True, Level.WARNING, 2)
+    assert replace(event, delta=-1) == Event(1, True, Level.WARNING, -1)
+    assert astuple(replace(event, urgent=False)) == (1, False, Level.WARNING, 3)
+
+
+def test_frozen():
+    event = FrozenEvent(True, Level.ERROR)
+    assert (event.urgent, event.level) == (True, Level.ERROR)
+    assert hash(event) == hash(FrozenEvent(True, Level.ERROR))
+    assert replace(event, urgent=False) == FrozenEvent(False, Level.ERROR)
+
+
+@pytest.mark.parametrize('instance', [Event(7, True, Level.ERROR, -2), FrozenEvent(True, Level.WARNING)])
+@pytest.mark.parametrize('pickle_protocol', [3, 4])
+def test_pickle(instance, pickle_protocol):
+    assert pickle.loads(pickle.dumps(instance, protocol=pickle_protocol)) == instance
+
+
+def test_inheritance(assertions):
+    @dataslots
+    @dataclass
+    class A:
+        x: bool = BitField(1, kind=bool)  # type: ignore
+
+    @dataslots
+    @dataclass
+    class B(A):
+        y: int = BitField(3, default=5)  # type: ignore
+
+    b = B(True)
+    assert (b.x, b.y) == (True, 5)
+    b.x = False
+    assert (b.x, b.y) == (False, 5)
+    assertions.assert_slots(A, ('_dataslots_packed_0',))
+    assertions.assert_slots(B, ('_dataslots_packed_1',))
+
+
+def test_requires_dataslots():
+    @dataclass
+    class A:
+        x: int = BitField(3)  # type: ignore
+
+    with pytest.raises(TypeError) as exc_info:
+        A(1)
+    assert exc_info.match("BitField 'x' can be used only in class decorated with dataslots")
+
+
+def test_reused_in_other_class():
+    flag = BitField(1, kind=bool)
+
+    @dataslots
+    @dataclass
+    class A:
+        f: bool = flag  # type: ignore
+        a: int = BitField(2, default=0)  # type: ignore
+
+    @dataclass
+    class B:
+        f: bool = flag  # type: ignore
+        b: int = BitField(3, default=0)  # type: ignore
+
+    with pytest.raises(TypeError) as exc_info:
+        dataslots(B)
+    assert exc_info.match("BitField 'f' is already used in class test_reused_in_other_class.<locals>.A, "
+                          "create new BitField for each class")
+    assert (A(True, 3).f, A(True, 3).a) == (True, 3)
+
+
+def test_rebind_in_dataclass_wrapper():
+    @dataslots_dataclass(slots=True)
+    class A:
+        x: int = BitField(3, default=1)  # type: ignore
+        y: 'CV[int]' = 5  # unpredictable field, class is processed twice
+        z: int = BitField(2, default=2)  # type: ignore
+
+    assert (A().x, A().z, A.y) == (1, 2, 5)
+    a = A(7, 3)
+    assert (a.x, a.z) == (7, 3)
+    assert all(slot in A.__slots__ for slot in (A.__dict__['x'].slot_name, A.__dict__['z'].slot_name))
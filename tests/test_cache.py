@@ -0,0 +1,220 @@
+import inspect
+import sys
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import field, fields, FrozenInstanceError
+from typing import ClassVar as CV
+
+import pytest
+
+from dataslots import dataclass, cache_info, cache_clear, _copy_function
+
+
+@pytest.fixture(autouse=True)
+def clear():
+    cache_clear()
+    yield
+    cache_clear()
+
+
+def _qualname(cls_qualname, name):
+    # Generated functions have qualname of their class since python 3.10
+    return '{}.{}'.format(cls_qualname, name) if sys.version_info >= (3, 10) else '__create_fn__.<locals>.' + name
+
+
+def _make(name, default=0.0, **options):
+    namespace = {
+        '__module__': __name__,
+        '__qualname__': name,
+        '__annotations__': {'x': int, 'y': float, 'tags': list},
+        'y': default,
+        'tags': field(default_factory=list, compare=False),
+    }
+    return dataclass(slots=True, **options)(type(name, (), namespace))
+
+
+def test_hits_and_misses(assertions):
+    A = _make('A')
+    B = _make('B')
+    _make('C', default=1.0)
+    _make('D', order=True)
+
+    assert cache_info() == (1, 3, 256, 3)
+    assertions.assert_slots(B, ('x', 'y', 'tags'))
+    assert B(1, tags=['a']) == B(1)
+    assert B(1) != A(1)
+    assert B(1, 2.5).y == 2.5
+    assert B(1).tags is not B(1).tags
+    assert repr(B(1)) == 'B(x=1, y=0.0, tags=[])'
+
+    assert B.__init__ is not A.__init__
+    assert B.__init__.__code__ is A.__init__.__code__
+    assert fields(B)[0] is not fields(A)[0]
+
+    cache_clear()
+    assert cache_info() == (0, 0, 256, 0)
+
+
+def test_generated_attributes():
+    def make():
+        @dataclass(slots=True, frozen=True)
+        class A:
+            x: int
+
+        return A
+
+    A, B = make(), make()
+    assert cache_info().hits == 1
+
+    with pytest.raises(FrozenInstanceError):
+        B(1).x = 2  # type: ignore
+    with pytest.raises(FrozenInstanceError):
+        B(1).y = 2  # type: ignore
+    assert hash(B(1)) == hash(A(1))
+    assert repr(B(1)) == 'test_generated_attributes.<locals>.make.<locals>.A(x=1)'
+    assert B.__setattr__.__qualname__ == _qualname('test_generated_attributes.<locals>.make.<locals>.A', '__setattr__')
+    assert B.__doc__ == 'A(x: int)'
+    assert str(inspect.signature(B)) == '(x: int) -> None'
+
+
+def test_qualname_and_doc():
+    A = _make('A')
+    B = _make('B')
+
+    assert B.__doc__.startswith('B(x: int, y: float = 0.0')
+    assert B.__init__.__qualname__ == _qualname('B', '__init__')
+    assert A.__init__.__qualname__ == _qualname('A', '__init__')
+
+
+def test_special_methods_set_to_none():
+    @dataclass(slots=True, frozen=True)
+    class X:
+        x: int
+
+        def __eq__(self, other):
+            return self.x == other.x
+
+        def __hash__(self):
+            return 1
+
+    @dataclass(slots=True, frozen=True)
+    class Y:
+        x: int
+
+        def __eq__(self, other):
+            return self.x == other.x
+
+    assert cache_info().hits == 0
+    assert hash(X(1)) == 1
+    assert Y.__hash__ is not None and hash(Y(1)) == hash((1,))
+
+
+def test_defaults_compared_by_identity():
+    negative_zero = -0.0
+    A = _make('A', default=0.0)
+    B = _make('B', default=negative_zero)
+    C = _make('C', default=float('-0.0'))
+
+    assert cache_info().hits == 0
+    assert str(A(1).y) == '0.0'
+    assert str(B(1).y) == str(C(1).y) == '-0.0'
+    assert str(_make('D', default=negative_zero)(1).y) == '-0.0'
+    assert cache_info().hits == 1
+
+
+def test_abstract_methods():
+    def make():
+        @dataclass(slots=True)
+        class A(ABC):
+            x: int
+
+            @abstractmethod
+            def run(self):
+                pass
+
+        return A
+
+    make()
+    with pytest.raises(TypeError):
+        make()(1)  # type: ignore
+    assert cache_info().hits == 1
+
+
+def test_unhashable_key():
+    def make():
+        @dataclass(slots=True)
+        class A:
+            x: int = field(default=0, metadata={'options': []})
+
+        return A
+
+    make(), make()
+    assert cache_info() == (0, 2, 256, 0)
+
+
+def test_lru(monkeypatch):
+    monkeypatch.setattr('dataslots._CLASS_CACHE_SIZE', 2)
+    _make('A', 1.0)
+    _make('B', 2.0)
+    _make('C', 1.0)
+    _make('D', 3.0)
+    _make('E', 2.0)
+
+    assert cache_info() == (1, 4, 2, 2)
+
+
+def test_unpredictable_fields():
+    def make():
+        @dataclass(slots=True)
+        class A:
+            x: int
+            y: 'CV[int]' = 5
+
+        return A
+
+    make(), make()
+    assert (cache_info().misses, cache_info().currsize) == (0, 0)
+
+
+def test_copy_function_with_empty_cell():
+    def outer():
+        def inner():
+            return value  # noqa: F821
+        value = 1
+        del value
+        return inner
+
+    fn = outer()
+    copied = _copy_function(fn, int, float)
+    assert copied.__closure__ is not None and fn.__closure__ is not None
+    assert copied.__closure__[0] is fn.__closure__[0]
+
+
+def test_copy_method():
+    class A:
+        def method(self):
+            return A
+
+    class B:
+        pass
+
+    copied = _copy_function(A.__dict__['method'], A, B)
+    assert copied.__qualname__ == B.__qualname__ + '.method'
+    assert copied(None) is B
+
+
+def test_concurrent_classes(monkeypatch):
+    monkeypatch.setattr('dataslots._CLASS_CACHE_SIZE', 2)
+
+    def make_many(index):
+        for i in range(50):
+            _make('A{}_{}'.format(index, i), float(i % 4))
+
+    threads = [threading.Thread(target=make_many, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    info = cache_info()
+    assert info.hits + info.misses == 200 and info.currsize == 2
@@ -0,0 +1,182 @@
+import asyncio
+import copy
+import pickle
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import pytest
+
+from dataslots import dataslots, Categorical, Categories, RecordBatch
+
+VENUES = Categories(['XNYS', 'XNAS'])
+
+
+@dataslots
+@dataclass
+class Trade:
+    price: float
+    country: str = Categorical()  # type: ignore
+    venue: str = Categorical(VENUES, default='XNYS')  # type: ignore
+    origin: str = Categorical(VENUES, default='XNAS')  # type: ignore
+    tags: list = field(default_factory=list)
+
+
+@contextmanager
+def fresh_categories():
+    """
+    Simulate other process: categories start with different values.
+    """
+    descriptors = [Trade.__dict__[name] for name in ('country', 'venue', 'origin')]
+    saved = [descriptor.categories for descriptor in descriptors]
+    venues = Categories(['XLON'])
+    for descriptor, categories in zip(descriptors, [Categories(['DE']), venues, venues]):
+        descriptor.categories = categories
+    try:
+        yield
+    finally:
+        for descriptor, categories in zip(descriptors, saved):
+            descriptor.categories = categories
+
+
+def test_categorical(assertions):
+    trade = Trade(1.0, ''.join(['U', 'S']), 'XNAS')
+
+    assertions.assert_slots(Trade, ('price', '_dataslots_country', '_dataslots_venue', '_dataslots_origin', 'tags'))
+    assert (trade.country, trade.venue, trade.origin) == ('US', 'XNAS', 'XNAS')
+    assert Trade.__dict__['venue'].get_code(trade) == 1
+    assert trade.country is Trade(2.0, ''.join(['U', 'S'])).country
+
+    trade.venue = 'XLON'
+    assert VENUES.values[2:] == ['XLON']
+    assert VENUES.decode(VENUES.encode('XLON')) == 'XLON'
+    assert len(VENUES) == 3
+    assert repr(VENUES) == "Categories(['XNYS', 'XNAS', 'XLON'])"
+
+
+def test_without_default():
+    with pytest.raises(TypeError):
+        Trade(1.0)  # type: ignore
+
+    trade = Trade.__new__(Trade)
+    with pytest.raises(AttributeError) as exc_info:
+        _ = trade.country
+    assert exc_info.match('country')
+
+    trade.price = 1.0
+    pickled = pickle.loads(pickle.dumps(trade))
+    assert pickled.price == 1.0 and not hasattr(pickled, 'country')
+
+
+@pytest.mark.parametrize('pickle_protocol', range(2, pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle(pickle_protocol):
+    trade = Trade(1.0, 'US', 'XNAS', tags=['a'])
+
+    payload = pickle.dumps(trade, protocol=pickle_protocol)
+    with fresh_categories():
+        pickled = pickle.loads(payload)
+
+        assert (pickled.price, pickled.country, pickled.venue, pickled.origin) == (1.0, 'US', 'XNAS', 'XNAS')
+        assert Trade.__dict__['country'].get_code(pickled) == 1
+        assert pickled.tags == ['a']
+
+
+def test_pickle_with_dict():
+    @dataslots(add_dict=True)
+    @dataclass
+    class A:
+        x: str = Categorical()  # type: ignore
+
+    a = A('a')
+    a.extra = 1  # type: ignore
+
+    pickled = copy.deepcopy(a)
+    assert (pickled.x, pickled.extra) == ('a', 1)  # type: ignore
+
+
+def test_frozen():
+    @dataslots
+    @dataclass(frozen=True)
+    class A:
+        x: str = Categorical(VENUES, default='XNYS')  # type: ignore
+
+    a = A('XNAS')
+    assert (a.x, A().x) == ('XNAS', 'XNYS')
+    assert copy.deepcopy(a) == a
+
+
+def test_custom_getstate():
+    @dataslots
+    @dataclass
+    class A:
+        x: str = Categorical()  # type: ignore
+
+        def __getstate__(self):
+            return self.x
+
+        def __setstate__(self, state):
+            self.x = state + '!'
+
+    assert copy.copy(A('a')).x == 'a!'
+
+
+def test_record_batch():
+    trades = [Trade(1.0, 'US'), Trade(2.0, 'PL', 'XNAS', 'XNYS')]
+    VENUES.encode('XPAR')
+
+    payload = pickle.dumps(RecordBatch(trades))
+    assert payload.count(b'XNAS') == 1
+    assert b'XPAR' not in payload
+
+    with fresh_categories():
+        pickled = list(pickle.loads(payload))
+        assert [(t.country, t.venue, t.origin) for t in pickled] == [('US', 'XNYS', 'XNAS'), ('PL', 'XNAS', 'XNYS')]
+        assert Trade.__dict__['venue'].categories.values == ['XLON', 'XNYS', 'XNAS']
+
+
+def test_columnar():
+    np = pytest.importorskip('numpy')
+    from dataslots.columnar import to_numpy, from_numpy
+
+    trades = [Trade(1.0, 'US'), Trade(2.0, 'PL', 'XNAS')]
+    array = to_numpy(trades)
+    codes = Trade.__dict__['country'].categories
+
+    assert array.dtype['venue'] == np.dtype('i4')
+    assert [codes.decode(code) for code in array['country']] == ['US', 'PL']
+    assert from_numpy(array, Trade) == trades
+    assert from_numpy(array[['price', 'country']], Trade) == [Trade(1.0, 'US'), Trade(2.0, 'PL')]
+
+    for code in (-1, len(codes)):
+        invalid = array.copy()
+        invalid['country'][1] = code
+        with pytest.raises(ValueError) as exc_info:
+            from_numpy(invalid, Trade)
+        assert exc_info.match(r"code {} of categorical field 'country' is out of range \(0\.\.{}\)".format(
+            code, len(codes) - 1))
+
+
+def test_stream():
+    from dataslots.stream import struct_layout, iter_records
+
+    @dataslots
+    @dataclass
+    class Order:
+        side: str = Categorical(Categories(['BUY', 'SELL']))  # type: ignore
+
+    async def main():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'\x01\x00\x00\x00\x00\x00\x00\x00')
+        reader.feed_eof()
+        return [order.side async for order in iter_records(reader, Order)]
+
+    async def invalid():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'\x02\x00\x00\x00')
+        reader.feed_eof()
+        return [order async for order in iter_records(reader, Order)]
+
+    assert struct_layout(Order).format == '<i'
+    assert asyncio.run(main()) == ['SELL', 'BUY']
+    with pytest.raises(ValueError) as exc_info:
+        asyncio.run(invalid())
+    assert exc_info.match(r"code 2 of categorical field 'side' is out of range \(0\.\.1\)")
@@ -0,0 +1,165 @@
+import copy
+import pickle
+from dataclasses import dataclass, field
+
+import pytest
+
+from dataslots import dataslots, dataclass as dataslots_dataclass, changed_fields, clear_changes, BitField
+from dataslots import DataslotsDescriptor
+
+
+class Upper(DataslotsDescriptor):
+    def __get__(self, instance, owner):
+        return self.get_value(instance)
+
+    def __set__(self, instance, value):
+        self.set_value(instance, value.upper())
+
+
+@dataslots(track_changes=True)
+@dataclass
+class Account:
+    id: int
+    name: str = Upper()  # type: ignore
+    balance: float = 0.0
+    active: bool = BitField(1, kind=bool, default=True)  # type: ignore
+    tags: list = field(default_factory=list)
+
+
+@dataslots(track_changes=True)
+@dataclass
+class Premium(Account):
+    level: int = 1
+
+
+def test_track_changes(assertions):
+    account = Account(1, 'a')
+    assert changed_fields(account) == ('id', 'name', 'balance', 'active', 'tags')
+    assertions.assert_not_member('__dict__', account)
+
+    clear_changes(account)
+    assert changed_fields(account) == ()
+
+    account.balance += 10
+    account.name = 'b'
+    account.active = False
+    assert changed_fields(account) == ('name', 'balance', 'active')
+    assert (account.balance, account.name, account.active) == (10.0, 'B', False)
+
+    account.tags.append('x')
+    assert 'tags' not in changed_fields(account)
+
+
+def test_failed_assignment():
+    account = Account(1, 'a')
+    clear_changes(account)
+
+    with pytest.raises(ValueError):
+        account.active = 5  # type: ignore
+    assert changed_fields(account) == ()
+
+
+def test_inheritance():
+    premium = Premium(1, 'a')
+    clear_changes(premium)
+
+    premium.level = 2
+    premium.id = 3
+    assert changed_fields(premium) == ('id', 'level')
+    assert Premium.__setattr__._dataslots_base_setattr is object.__setattr__  # type: ignore
+
+
+def test_subclass_without_option():
+    @dataslots
+    @dataclass
+    class A(Account):
+        z: int = 0
+
+    @dataslots_dataclass(slots=True)
+    class B(A):
+        w: int = 0
+
+    a = A(1, 'a')
+    clear_changes(a)
+    a.z = 1
+    a.balance = 5
+    assert changed_fields(a) == ('balance', 'z')
+
+    b = B(1, 'a')
+    clear_changes(b)
+    b.w = 2
+    b.z = 3
+    assert changed_fields(b) == ('z', 'w')
+
+
+def test_dataclass_wrapper():
+    @dataslots_dataclass(slots=True, track_changes=True)
+    class A:
+        x: int
+        y: int = 0
+
+    a = A(1)
+    assert changed_fields(a) == ('x', 'y')
+    clear_changes(a)
+    a.y = 2
+    assert changed_fields(a) == ('y',)
+    assert changed_fields(copy.copy(a)) == ('y',)
+
+    with pytest.raises(TypeError) as exc_info:
+        dataslots_dataclass(slots=True, frozen=True, track_changes=True)
+    assert exc_info.match('track_changes cannot be used with frozen dataclass')
+
+
+def test_instance_without_changes():
+    account = Account.__new__(Account)
+    assert changed_fields(account) == ()
+
+
+@pytest.mark.parametrize('pickle_protocol', range(2, pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle(pickle_protocol):
+    account = Account(1, 'a')
+    clear_changes(account)
+    account.balance = 5
+
+    pickled = pickle.loads(pickle.dumps(account, protocol=pickle_protocol))
+    assert pickled == account
+    assert changed_fields(pickled) == ('balance',)
+    assert changed_fields(copy.copy(account)) == ('balance',)
+
+
+def test_custom_setattr():
+    @dataslots(track_changes=True)
+    @dataclass
+    class A:
+        x: int
+
+        def __setattr__(self, name, value):
+            super().__setattr__(name, value * 2)
+
+    a = A(1)
+    assert a.x == 2
+    assert changed_fields(a) == ('x',)
+
+
+def test_not_tracked():
+    @dataslots
+    @dataclass
+    class A:
+        x: int
+
+    with pytest.raises(TypeError) as exc_info:
+        changed_fields(A(1))
+    assert exc_info.match(r'changes are tracked only in classes decorated with dataslots\(track_changes=True\)')
+
+    with pytest.raises(TypeError):
+        clear_changes(A(1))
+
+
+def test_frozen():
+    @dataclass(frozen=True)
+    class A:
+        x: int
+
+    with pytest.raises(TypeError) as exc_info:
+        dataslots(track_changes=True)(A)
+    assert exc_info.match('track_changes cannot be used with frozen dataclass')
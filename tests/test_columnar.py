@@ -0,0 +1,215 @@
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from dataslots import dataslots, BitField  # noqa: E402
+from dataslots.columnar import numpy_dtype, to_numpy, from_numpy  # noqa: E402
+
+
+class Side(IntEnum):
+    BUY = 0
+    SELL = 1
+
+
+@dataslots
+@dataclass(frozen=True)
+class Trade:
+    price: float
+    volume: int
+    venue: str
+    symbol: str = field(default='', metadata={'dtype': 'U8'})
+    side: Side = BitField(1, kind=Side, default=Side.BUY)  # type: ignore
+    flags: int = BitField(12, default=0)  # type: ignore
+    cancelled: bool = BitField(1, kind=bool, default=False)  # type: ignore
+
+
+@dataslots
+@dataclass
+class Point:
+    x: 'float'
+    y: 'Undefined' = None  # type: ignore # noqa: F821
+
+
+def test_dtype():
+    assert numpy_dtype(Trade) == np.dtype([
+        ('price', 'f8'), ('volume', 'i8'), ('venue', 'O'), ('symbol', 'U8'),
+        ('side', 'u1'), ('flags', 'u2'), ('cancelled', '?'),
+    ])
+
+
+def test_dtype_unresolved_annotations():
+    assert numpy_dtype(Point) == np.dtype([('x', 'O'), ('y', 'O')])
+
+
+def test_dtype_not_dataclass():
+    with pytest.raises(TypeError) as exc_info:
+        numpy_dtype(int)
+    assert exc_info.match('numpy_dtype can be used only with dataclass')
+
+
+def test_round_trip():
+    trades = [Trade(10.5, 100, 'XWAR', 'ABC', Side.SELL, 4095, True), Trade(11.0, 5, 'XNYS')]
+    array = to_numpy(trades)
+
+    assert array['price'].tolist() == [10.5, 11.0]
+    assert array['venue'].tolist() == ['XWAR', 'XNYS']
+    assert array['flags'].tolist() == [4095, 0]
+
+    restored = from_numpy(array, Trade)
+    assert restored == trades
+    assert restored[0].side is Side.SELL
+
+
+def test_single_field():
+    @dataslots
+    @dataclass
+    class A:
+        x: int
+
+    array = to_numpy([A(1), A(2)])
+    assert array['x'].tolist() == [1, 2]
+    assert array.flags.writeable
+    assert from_numpy(array, A) == [A(1), A(2)]
+    assert len(to_numpy([], A)) == 0
+
+
+def test_value_not_matching_dtype():
+    @dataslots
+    @dataclass
+    class A:
+        x: int
+        y: float
+
+    @dataslots
+    @dataclass
+    class B:
+        x: int
+        y: float
+        z: object = None
+
+    assert to_numpy([A(1, 2)]).tolist() == [(1, 2.0)]  # type: ignore
+    with pytest.raises(ValueError) as exc_info:
+        to_numpy([A(1.7, 2)])  # type: ignore
+    assert exc_info.match('instances of .*A cannot be stored as')
+
+    assert to_numpy([B(1, 2)]).tolist() == [(1, 2.0, None)]  # type: ignore
+    with pytest.raises(ValueError) as exc_info_columns:
+        to_numpy([B(1, 2), B(1.7, 2)])  # type: ignore
+    assert exc_info_columns.match(r"values of field 'x' \(float64\) cannot be stored as int64 without loss")
+    with pytest.raises(ValueError) as exc_info_columns:
+        to_numpy([B(1, 2j)])  # type: ignore
+    assert exc_info_columns.match(r"values of field 'y' \(complex128\) cannot be stored as float64 without loss")
+
+
+def test_bool_and_integer_range():
+    @dataslots
+    @dataclass
+    class A:
+        ok: bool
+        x: int = field(default=0, metadata={'dtype': 'i1'})
+
+    @dataslots
+    @dataclass
+    class B:
+        ok: bool
+        x: int = field(default=0, metadata={'dtype': 'u8'})
+        z: object = None
+
+    assert to_numpy([A(True), A(1)]).tolist() == [(True, 0), (True, 0)]  # type: ignore
+    for value in (2, 'no'):
+        with pytest.raises(ValueError):
+            to_numpy([A(False), A(value)])  # type: ignore
+    with pytest.raises(ValueError):
+        to_numpy([A(False, 300)])
+
+    assert to_numpy([B(True), B(0, 2**63)]).tolist() == [(True, 0, None), (False, 2**63, None)]  # type: ignore
+    with pytest.raises(ValueError) as exc_info:
+        to_numpy([B(True), B(2)])  # type: ignore
+    assert exc_info.match(r"values of field 'ok' are out of range of bool \(0\.\.1\)")
+    with pytest.raises(ValueError) as exc_info:
+        to_numpy([B(True), B('no')])  # type: ignore
+    assert exc_info.match(r"values of field 'ok' \(<U\d\) cannot be stored as bool without loss")
+    with pytest.raises(ValueError) as exc_info:
+        to_numpy([B(True, -1)])
+    assert exc_info.match(r"values of field 'x' are out of range of uint64")
+    with pytest.raises(ValueError) as exc_info:
+        to_numpy([B(True, 2**64)])
+    assert exc_info.match(r"values of field 'x' are out of range of uint64")
+
+
+def test_non_native_byte_order():
+    @dataslots
+    @dataclass
+    class A:
+        x: int = field(metadata={'dtype': '>i4'})
+        y: int = field(metadata={'dtype': '<i4'})
+
+    array = to_numpy([A(1, 2), A(3, 4)])
+    assert array.dtype == np.dtype([('x', '>i4'), ('y', '<i4')])
+    assert array.tolist() == [(1, 2), (3, 4)]
+
+
+def test_empty():
+    assert len(to_numpy([], Trade)) == 0
+    assert from_numpy(to_numpy([], Trade), Trade) == []
+
+    with pytest.raises(ValueError) as exc_info:
+        to_numpy([])
+    assert exc_info.match('cls is required to convert empty sequence')
+
+
+def test_wide_bit_field():
+    @dataslots
+    @dataclass
+    class A:
+        x: int = BitField(70)  # type: ignore
+
+    assert numpy_dtype(A) == np.dtype([('x', 'O')])
+    assert from_numpy(to_numpy([A(2 ** 69)]), A) == [A(2 ** 69)]
+
+
+def test_subset_of_columns():
+    array = np.array([(1.5,)], dtype=[('x', 'f8')])
+    point, = from_numpy(array, Point)
+    assert point == Point(1.5)
+
+    @dataslots
+    @dataclass
+    class A:
+        x: int
+        tags: list = field(default_factory=list)
+        side: Side = BitField(1, kind=Side, default=Side.SELL)  # type: ignore
+
+    a, b = from_numpy(np.array([(1,), (2,)], dtype=[('x', 'i8')]), A)
+    assert (a, b) == (A(1), A(2))
+    assert a.tags is not b.tags
+
+    with pytest.raises(ValueError) as exc_info:
+        from_numpy(np.zeros(1, dtype=[('tags', 'O')]), A)
+    assert exc_info.match('array has no columns for fields of .*A without default: x')
+
+
+def test_invalid_array():
+    with pytest.raises(TypeError) as exc_info:
+        from_numpy(np.arange(5), Point)
+    assert exc_info.match('structured array is required')
+
+    with pytest.raises(ValueError) as exc_info_columns:
+        from_numpy(np.zeros(1, dtype=[('x', 'f8'), ('z', 'f8'), ('a', 'f8')]), Point)
+    assert exc_info_columns.match('array columns are not fields of Point: a, z')
+
+
+def test_frozen_with_dict():
+    @dataclass(frozen=True)
+    class A:
+        x: int
+
+    @dataslots
+    @dataclass(frozen=True)
+    class B(A):
+        y: int
+
+    assert from_numpy(to_numpy([B(1, 2)]), B) == [B(1, 2)]
@@ -3,11 +3,12 @@ import platform
 import sys
 import weakref
 from dataclasses import dataclass, field, InitVar
-from typing import ClassVar, TypeVar, Generic
+from typing import Any, Callable, ClassVar, TypeVar, Generic
 
 import pytest
 
 from dataslots import dataslots
+from dataslots import dataclass as dataslots_dataclass
 
 
 def test_basic_slots(assertions):
@@ -310,3 +311,45 @@ def test_add_custom_function():
             return A(self.x + other.x)
 
     assert A(x=5) + A(x=7) == A(x=12)
+
+
+@pytest.mark.parametrize('decorator', [lambda cls: dataslots(dataclass(cls)), dataslots_dataclass(slots=True)])
+def test_class_cell(decorator: Callable[[type], Any]):
+    class Base:
+        def name(self) -> str:
+            return 'base'
+
+        @classmethod
+        def kind(cls) -> str:
+            return 'base'
+
+    @decorator
+    class A(Base):
+        x: int
+
+        def name(self):
+            return 'derived ' + super().name()
+
+        @classmethod
+        def kind(cls):
+            return 'derived ' + super().kind()
+
+        @staticmethod
+        def static():
+            return __class__  # type: ignore # noqa: F821
+
+        @property
+        def prop(self):
+            return __class__  # type: ignore # noqa: F821
+
+        def unbound(self):
+            return unbound_variable
+
+    unbound_variable = 10
+    a = A(1)  # type: ignore
+
+    assert a.name() == 'derived base'
+    assert A.kind() == 'derived base'
+    assert A.static() is A
+    assert a.prop is A
+    assert a.unbound() == 10
@@ -0,0 +1,297 @@
+import functools
+import importlib
+import sys
+import textwrap
+import tracemalloc
+import weakref
+from dataclasses import dataclass
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ModuleSpec
+from typing import Any
+
+import pytest
+
+from dataslots import dataslots, BitField, DataslotsDescriptor
+from dataslots.hook import install
+from dataslots.hook import _conversion_problem, _estimate_saving, _slots_probe, _undeclared_attributes
+
+MODELS = '''
+from dataclasses import dataclass, field
+
+from dataslots import dataslots
+
+
+@dataclass
+class Point:
+    x: int
+    y: int = 0
+
+    def move(self, dx):
+        self.x += dx
+
+
+Alias = Point
+
+
+@dataclass
+class Base:
+    a: int
+
+
+@dataclass
+class Derived(Base):
+    b: int
+
+
+@dataslots
+@dataclass
+class Slotted:
+    a: int
+
+
+@dataclass
+class FromSlotted(Slotted):
+    b: int = 0
+
+
+@dataclass
+class Cached:
+    x: int
+
+    def compute(self):
+        self._cache = self.x * 2
+
+
+@dataclass
+class WithDict:
+    x: int
+
+    def as_dict(self):
+        return vars(self)
+
+
+@dataclass
+class Constant:
+    x: int
+
+
+ORIGIN = Constant(0)
+
+
+class NotDataclass:
+    pass
+'''
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    root = tmp_path / 'hooked'
+    (root / 'sub').mkdir(parents=True)
+    (root / '__init__.py').write_text('')
+    (root / 'sub' / '__init__.py').write_text('')
+    (root / 'sub' / 'models.py').write_text(textwrap.dedent(MODELS))
+    (tmp_path / 'other.py').write_text(textwrap.dedent(MODELS))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield 'hooked'
+    for name in ('hooked', 'hooked.sub', 'hooked.sub.models', 'other'):
+        sys.modules.pop(name, None)
+
+
+def _reports(hook):
+    return {report.qualname: report for report in hook.reports}
+
+
+def test_install(package, assertions):
+    hook = install(packages=[package])
+    try:
+        models = importlib.import_module('hooked.sub.models')
+        other = importlib.import_module('other')
+        with pytest.raises(ModuleNotFoundError):
+            importlib.import_module('hooked.missing')
+    finally:
+        hook.uninstall()
+
+    assert hook not in sys.meta_path
+    loader: Any = models.__loader__
+    assert 'class Point' in loader.get_source('hooked.sub.models')
+    assertions.assert_slots(models.Point, ('x', 'y', '__weakref__'))
+    assertions.assert_slots(models.FromSlotted, ('b', '__weakref__'))
+    assert models.Alias is models.Point
+    assert '__slots__' not in other.Point.__dict__
+
+    point = models.Point(1)
+    point.move(2)
+    assert point == models.Point(3)
+    assert weakref.ref(point)() is point
+    assertions.assert_not_member('__dict__', point)
+
+    reports = _reports(hook)
+    assert {report.module for report in hook.reports} == {'hooked.sub.models'}
+    assert [name for name, report in reports.items() if report.converted] == ['Point', 'FromSlotted']
+    assert reports['Point'].reason is None and reports['Point'].estimated_saving is None
+    assert reports['Base'].reason == 'class has subclasses: Derived'
+    assert reports['Derived'].reason == 'base class Base has no __slots__'
+    assert reports['Slotted'].reason == 'class already has __slots__'
+    assert reports['Cached'].reason == 'methods use attributes which are not fields: _cache'
+    assert reports['WithDict'].reason == 'methods use attributes which are not fields: __dict__'
+    assert reports['Constant'].reason == 'instances are created during module import'
+    assert reports['Cached'].estimated_saving is None
+    assert 'NotDataclass' not in reports
+
+
+def test_dry_run(package):
+    hook = install(packages=[package], dry_run=True)
+    try:
+        models = importlib.import_module('hooked.sub.models')
+    finally:
+        hook.uninstall()
+
+    reports = _reports(hook)
+    assert '__slots__' not in models.Point.__dict__
+    assert not any(report.converted for report in hook.reports)
+    saving = reports['Point'].estimated_saving
+    assert reports['Point'].reason is None and saving is not None and saving > 0
+
+
+def test_custom_metaclass():
+    class Meta(type):
+        pass
+
+    @dataslots
+    @dataclass
+    class A:
+        x: int
+
+    @dataclass
+    class B(metaclass=Meta):
+        x: int
+
+    assert _conversion_problem(B, ['x'], {}) == 'custom metaclass Meta'
+    assert _conversion_problem(A, ['x'], {}) == 'class already has __slots__'
+
+
+def test_class_functions():
+    class A:
+        @property
+        def x(self):
+            return self._x
+
+        @x.setter
+        def x(self, value):
+            self._x = value
+
+        @classmethod
+        def create(cls):
+            def nested(obj):
+                obj.y = 1
+            return nested
+
+        @staticmethod
+        def other(obj):
+            obj.__dict__.clear()
+
+    assert _undeclared_attributes(A, []) == ['_x', 'y', '__dict__']
+
+
+class DataslotsDescriptorMock(DataslotsDescriptor):
+    def __get__(self, instance, owner) -> Any:
+        return self.get_value(instance) if instance else 0
+
+    def __set__(self, instance, value):
+        self.set_value(instance, value)
+
+
+def test_dict_descriptors():
+    class cached_property:  # e.g. third-party implementation
+        def __init__(self, func):
+            self.func = func
+
+        def __get__(self, instance, owner):
+            value = instance.__dict__[self.func.__name__] = self.func(instance)
+            return value
+
+    @dataclass
+    class A:
+        x: int
+
+        @cached_property
+        def double(self):
+            return self.x * 2
+
+    assert _conversion_problem(A, ['x'], {}) == 'class uses descriptors which store values in __dict__: double'
+
+    if hasattr(functools, 'cached_property'):
+        class Cached(functools.cached_property):  # type: ignore
+            pass
+
+        @dataclass
+        class B:
+            x: int
+            lazy = Cached(lambda self: self.x)
+
+        assert _conversion_problem(B, ['x'], {}) == 'class uses descriptors which store values in __dict__: lazy'
+
+
+def test_slots_probe(assertions):
+    @dataslots
+    @dataclass
+    class Base:
+        flag: bool = BitField(1, kind=bool, default=False)  # type: ignore
+
+    @dataclass
+    class A(Base):
+        x: int = 0
+        y: int = BitField(3, default=0)  # type: ignore
+        z: int = DataslotsDescriptorMock()  # type: ignore
+        p: int = property(lambda self: 1)  # type: ignore
+
+    probe = _slots_probe(A, ['flag', 'x', 'y', 'z', 'p'])
+    assertions.assert_slots(probe, ('_dataslots_packed_0', 'x', '_dataslots_packed_', '_dataslots_z', '__weakref__'))
+
+
+def test_estimate_saving():
+    @dataclass
+    class A:
+        x: int = 0
+        y: int = 0
+        z: int = 0
+
+    class WithNew:
+        def __new__(cls, value):
+            return super().__new__(cls)
+
+    probe = _slots_probe(A, ['x', 'y', 'z'])
+    saving = _estimate_saving(A, probe, ['x', 'y', 'z'])
+    assert saving is not None and 0 < saving < 200
+    tracemalloc.start()
+    try:
+        assert _estimate_saving(A, probe, ['x', 'y', 'z']) == saving
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert _estimate_saving(WithNew, probe, []) is None
+
+
+def test_loader_without_exec_module():
+    class Finder(MetaPathFinder):
+        def find_spec(self, fullname, path, target=None):
+            return ModuleSpec(fullname, None)
+
+    finder = Finder()
+    hook = install(packages=['legacy'])
+    sys.meta_path.insert(1, finder)
+    try:
+        spec = hook.find_spec('legacy.module', None)
+    finally:
+        sys.meta_path.remove(finder)
+        hook.uninstall()
+        hook.uninstall()
+
+    assert spec is not None and spec.loader is None
+    assert hook not in sys.meta_path
+
+
+def test_packages_as_string():
+    with pytest.raises(TypeError) as exc_info:
+        install(packages='hooked')
+    assert exc_info.match('packages must be iterable of package names')
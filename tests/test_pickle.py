@@ -1,10 +1,12 @@
 import pickle
 import sys
+import textwrap
 from dataclasses import dataclass, field, astuple
+from typing import Any, Dict, List, Optional
 
 import pytest
 
-from dataslots import dataslots
+from dataslots import dataslots, dataclass as dataslots_dataclass, _buffer_kinds, _restore_buffer
 
 # As mentioned in https://docs.python.org/3/library/pickle.html#what-can-be-pickled-and-unpickled, only classes
 # that are defined at the top level of module can be pickled.
@@ -35,6 +37,36 @@ class PickleFrozenWithDictTest:
     y: int = 20
 
 
+@dataslots
+@dataclass
+class PickleBuffersTest:
+    payload: bytes
+    mutable: bytearray = field(default_factory=bytearray)
+    view: Optional[memoryview] = None
+    name: str = 'buffers'
+
+
+@dataslots_dataclass(slots=True, frozen=True)
+class PickleFrozenBuffersTest:
+    payload: 'bytes'
+    view: Optional[memoryview] = None
+
+
+@dataslots(add_dict=True)
+@dataclass
+class PickleBuffersWithDictTest:
+    payload: bytes
+
+
+@dataslots
+@dataclass
+class PickleBuffersWithReduceTest:
+    payload: bytes
+
+    def __reduce__(self):
+        return PickleBuffersWithReduceTest, (self.payload,)
+
+
 @pytest.mark.parametrize(
     "pickle_protocol",
     [3, 4, pytest.param(5, marks=pytest.mark.skipif(sys.version_info < (3, 8), reason="Protocol not available"))],
@@ -82,3 +114,93 @@ def test_frozen_pickle_with_dict(assertions, pickle_protocol):
     assert instance == pickled
     assert instance.z == pickled.z == 20  # type: ignore
     assertions.assert_member('__setstate__', instance)
+
+
+protocol_5 = pytest.mark.skipif(sys.version_info < (3, 8), reason="Protocol not available")
+
+
+@protocol_5
+def test_out_of_band_buffers():
+    payload, mutable = b'x' * 1024, bytearray(b'y' * 1024)
+    instance = PickleBuffersTest(payload, mutable, memoryview(b'z' * 1024))
+
+    buffers: List[pickle.PickleBuffer] = []
+    p = pickle.dumps(instance, protocol=5, buffer_callback=buffers.append)
+    pickled = pickle.loads(p, buffers=buffers)
+
+    assert len(buffers) == 3 and len(p) < 1024
+    assert pickled.payload is payload
+    assert pickled.mutable is mutable
+    assert type(pickled.view) is memoryview and pickled.view == instance.view
+    assert pickled.name == 'buffers'
+
+
+@protocol_5
+def test_in_band_buffers():
+    instance = PickleBuffersTest(b'x', bytearray(b'y'), memoryview(b'z'))
+
+    pickled = pickle.loads(pickle.dumps(instance, protocol=5))
+
+    assert (pickled.payload, pickled.mutable, pickled.view) == (b'x', bytearray(b'y'), memoryview(b'z'))
+    assert (type(pickled.payload), type(pickled.mutable), type(pickled.view)) == (bytes, bytearray, memoryview)
+
+    instance.view = None
+    assert pickle.loads(pickle.dumps(instance, protocol=4)) == instance
+
+
+@protocol_5
+@pytest.mark.parametrize('instance', [
+    PickleFrozenBuffersTest(b'x', memoryview(b'abc')[1:]),
+    PickleBuffersWithDictTest(b'x'),
+])
+def test_buffers(instance):
+    buffers: List[pickle.PickleBuffer] = []
+    p = pickle.dumps(instance, protocol=5, buffer_callback=buffers.append)
+    assert pickle.loads(p, buffers=buffers) == instance
+    assert len(buffers) == 1 + (type(instance) is PickleFrozenBuffersTest)
+
+
+@protocol_5
+def test_not_contiguous_buffer():
+    with pytest.raises(TypeError):
+        pickle.dumps(PickleBuffersTest(b'x', view=memoryview(b'abcd')[::2]), protocol=5)
+
+
+@protocol_5
+def test_buffers_with_reduce():
+    assert '__reduce_ex__' in PickleBuffersTest.__dict__
+    assert '__reduce_ex__' not in PickleBuffersWithReduceTest.__dict__
+    assert '__reduce_ex__' not in PickleTest.__dict__
+    assert pickle.loads(pickle.dumps(PickleBuffersWithReduceTest(b'x'), protocol=5)).payload == b'x'
+
+
+@protocol_5
+def test_restore_buffer():
+    data = bytearray(b'abcd')
+    assert _restore_buffer(bytes, memoryview(data)) == b'abcd'
+    assert _restore_buffer(bytearray, pickle.PickleBuffer(memoryview(data)[1:])) == bytearray(b'bcd')
+
+
+@protocol_5
+def test_postponed_annotations():
+    namespace: Dict[str, Any] = {'__name__': __name__}
+    exec(textwrap.dedent('''
+        from __future__ import annotations
+        from dataclasses import dataclass
+        from typing import Optional
+
+        @dataclass
+        class A:
+            payload: Optional[bytes]
+            view: memoryview
+
+        @dataclass
+        class B:
+            payload: bytes
+            parent: Optional[B] = None
+    '''), namespace)
+    A, B = namespace['A'], namespace['B']
+
+    assert _buffer_kinds(A.__mro__, ['payload', 'view']) == {'payload': bytes, 'view': memoryview}
+    # Forward reference to B cannot be resolved, so annotations are matched by name
+    assert _buffer_kinds(B.__mro__, ['payload', 'parent']) == {'payload': bytes}
@@ -0,0 +1,189 @@
+import inspect
+import sys
+from dataclasses import dataclass, field, fields, InitVar
+
+import pytest
+
+from dataslots import dataslots, Pool, BitField, changed_fields
+
+
+@dataslots(track_changes=True)
+@dataclass
+class Tick:
+    price: float
+    volume: int = 0
+    flags: int = BitField(3, default=0)  # type: ignore
+    tags: list = field(default_factory=list)
+    cache: dict = field(init=False, repr=False, compare=False)
+
+
+@dataslots
+@dataclass(frozen=True)
+class FrozenTick:
+    price: float
+
+
+@dataclass
+class PlainTick:
+    price: float
+
+
+@pytest.mark.parametrize('debug', [False, True])
+@pytest.mark.parametrize('clear', [False, True])
+def test_reuse(debug, clear):
+    pool = Pool(Tick, clear=clear, debug=debug)
+    tick = pool.acquire(1.5, 10, flags=2)
+    tick.tags.append('a')
+    tick.cache = {'x': 1}
+    pool.release(tick)
+
+    assert len(pool) == 1
+    reused = pool.acquire(2.5)
+    assert reused is tick
+    assert reused == Tick(2.5)
+    assert reused.tags == [] and not hasattr(reused, 'cache')
+    assert changed_fields(reused) == ('price', 'volume', 'flags', 'tags')
+    assert len(pool) == 0
+
+
+def test_acquire_signature():
+    def parameters(fn):
+        return [(p.name, p.kind, p.default) for p in inspect.signature(fn).parameters.values()]
+
+    pool = Pool(Tick)
+    assert parameters(pool.acquire) == parameters(Tick)
+    assert pool.acquire(tags=['a'], price=1.0) == Tick(1.0, tags=['a'])
+
+
+@pytest.mark.parametrize('cls', [FrozenTick, PlainTick])
+def test_other_classes(cls):
+    pool = Pool(cls, debug=True)
+    instance = pool.acquire(1.0)
+    if cls is PlainTick:
+        instance.extra = 1  # type: ignore
+    pool.release(instance)
+
+    reused = pool.acquire(2.0)
+    assert reused is instance and reused == cls(2.0)
+    assert not hasattr(reused, 'extra')
+
+
+@pytest.mark.parametrize('clear', [False, True])
+def test_maxsize(clear):
+    pool = Pool(Tick, maxsize=2, clear=clear)
+    ticks = [pool.acquire(i) for i in range(3)]
+    for tick in ticks:
+        pool.release(tick)
+
+    assert len(pool) == 2
+    assert hasattr(ticks[2], 'price') is not clear
+
+
+def test_use_after_release():
+    pool = Pool(Tick, debug=True)
+    tick = pool.acquire(1.5)
+    pool.release(tick)
+
+    for action in [lambda: tick.price, lambda: setattr(tick, 'price', 1), lambda: delattr(tick, 'price'),
+                   lambda: repr(tick)]:
+        with pytest.raises(RuntimeError) as exc_info:
+            action()
+        assert exc_info.match('instance of Tick was released to pool')
+
+    with pytest.raises(ValueError) as exc_info_release:
+        pool.release(tick)
+    assert exc_info_release.match('instance of Tick is already released')
+
+
+def test_invalid_release():
+    pool = Pool(Tick)
+    with pytest.raises(TypeError) as exc_info:
+        pool.release(FrozenTick(1.0))
+    assert exc_info.match("pool of Tick cannot release 'FrozenTick'")
+
+
+def test_invalid_class():
+    with pytest.raises(TypeError) as exc_info:
+        Pool(int)
+    assert exc_info.match('Pool can be used only with dataclass')
+
+
+def test_empty_class():
+    @dataslots
+    @dataclass
+    class A:
+        pass
+
+    pool = Pool(A)
+    pool.release(pool.acquire())
+    assert isinstance(pool.acquire(), A)
+
+
+def test_init_fallback():
+    @dataslots(add_dict=True)
+    @dataclass
+    class A:
+        x: int
+        factor: InitVar[int] = 1
+
+        def __post_init__(self, factor):
+            self.x *= factor
+
+    @dataslots
+    @dataclass
+    class B:
+        x: int
+
+        def __init__(self, x):
+            self.x = x + 1
+
+    @dataslots
+    @dataclass
+    class C:
+        _obj: int
+
+    for cls, args, expected in [(A, (2, 3), 6), (B, (1,), 2), (C, (1,), 1)]:
+        pool = Pool(cls)
+        instance = pool.acquire(1)
+        pool.release(instance)
+        reused = pool.acquire(*args)
+        assert reused is instance and reused == cls(*args)
+        assert getattr(reused, fields(cls)[0].name) == expected
+        assert str(inspect.signature(pool.acquire)) == '(*args, **kwargs)'
+
+
+@pytest.mark.parametrize('clear', [False, True])
+def test_reinitialise(clear):
+    @dataslots(add_dict=True)
+    @dataclass
+    class A:
+        x: int
+        y: list = field(init=False, default_factory=list)
+        z: int = field(init=False)
+
+        def __post_init__(self):
+            self.z = self.x * 2
+
+    pool = Pool(A, clear=clear)
+    instance = pool.acquire(1)
+    instance.y.append(1)
+    instance.extra = 1  # type: ignore
+    pool.release(instance)
+
+    reused = pool.acquire(2)
+    assert (reused.x, reused.y, reused.z) == (2, [], 4)
+    assert reused.__dict__ == {}
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason='kw_only is not supported')
+def test_kw_only():
+    @dataslots
+    @dataclass
+    class A:
+        x: int = field(kw_only=True)  # type: ignore
+        y: int = 0
+
+    pool = Pool(A)
+    pool.release(pool.acquire(x=1))
+    assert str(inspect.signature(pool.acquire)) == '(y=0, *, x)'
+    assert pool.acquire(2, x=1) == A(2, x=1)
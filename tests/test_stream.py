@@ -0,0 +1,193 @@
+import asyncio
+from dataclasses import dataclass, field
+from enum import IntEnum
+from struct import pack
+from typing import List
+
+import pytest
+
+from dataslots import dataslots, BitField
+from dataslots.stream import struct_layout, iter_batches, iter_records
+
+
+class Side(IntEnum):
+    BUY = 0
+    SELL = 1
+
+
+@dataslots
+@dataclass
+class Trade:
+    price: float
+    volume: int
+    side: Side = BitField(1, kind=Side, default=Side.BUY)  # type: ignore
+    symbol: bytes = field(default=b'', metadata={'struct': '4s'})
+    seq: int = field(default=0, metadata={'struct': 'I'})
+    active: bool = True
+
+    def __post_init__(self):
+        raise AssertionError('__init__ should not be called')
+
+
+TRADES = [(10.5, 100, 1, b'ABCD', 1, True), (11.0, 20, 0, b'XYZ\0', 2, False), (9.25, 7, 1, b'QQQQ', 3, True)]
+PAYLOAD = b''.join(pack('<dqB4sI?', *trade) for trade in TRADES)
+
+
+def _collect(source, batch_size):
+    async def main():
+        return [(r.price, r.volume, r.side, r.symbol, r.seq, r.active)
+                async for r in iter_records(await source(), Trade, batch_size=batch_size)]
+    return asyncio.run(main())
+
+
+def _reader(*chunks):
+    async def create():
+        reader = asyncio.StreamReader()
+        for chunk in chunks:
+            reader.feed_data(chunk)
+        reader.feed_eof()
+        return reader
+    return create
+
+
+def _iterable(*chunks):
+    async def create():
+        async def gen():
+            for chunk in chunks:
+                yield chunk
+        return gen()
+    return create
+
+
+def test_struct_layout():
+    assert struct_layout(Trade).format == '<dqB4sI?'
+    assert struct_layout(Trade, '>').size == 26
+
+
+@pytest.mark.parametrize('source', [
+    _reader(PAYLOAD),
+    _reader(PAYLOAD[:5], PAYLOAD[5:40], PAYLOAD[40:]),
+    _iterable(PAYLOAD),
+    _iterable(*(PAYLOAD[i:i + 7] for i in range(0, len(PAYLOAD), 7))),
+])
+@pytest.mark.parametrize('batch_size', [1, 2, 1024])
+def test_iter_records(source, batch_size):
+    records = _collect(source, batch_size)
+
+    assert records == TRADES
+    assert type(records[0][2]) is Side
+
+
+@pytest.mark.parametrize('source, sizes', [
+    (_reader(PAYLOAD), [2, 1]),
+    (_iterable(PAYLOAD), [2, 1]),
+    (_iterable(PAYLOAD[:30], PAYLOAD[30:]), [1, 2]),
+])
+def test_iter_batches(source, sizes):
+    async def main():
+        return [len(batch) async for batch in iter_batches(await source(), Trade, batch_size=2)]
+
+    assert asyncio.run(main()) == sizes
+
+
+@pytest.mark.parametrize('kind', ['reader', 'iterable'])
+def test_records_not_delayed(kind):
+    async def main():
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def chunks():
+            while True:
+                yield await queue.get()
+
+        reader = asyncio.StreamReader()
+        source = reader if kind == 'reader' else chunks()
+        feed = reader.feed_data if kind == 'reader' else queue.put_nowait
+        records = iter_records(source, Trade)
+
+        feed(PAYLOAD[:30])
+        first = await asyncio.wait_for(records.__anext__(), 1)
+        feed(PAYLOAD[30:40])
+        feed(PAYLOAD[40:60])
+        second = await asyncio.wait_for(records.__anext__(), 1)
+        pending = asyncio.ensure_future(records.__anext__())
+        await asyncio.sleep(0)
+        feed(PAYLOAD[60:])
+        third = await asyncio.wait_for(pending, 1)
+        return [(r.price, r.volume, r.side, r.symbol, r.seq, r.active) for r in (first, second, third)]
+
+    assert asyncio.run(main()) == TRADES
+
+
+@pytest.mark.parametrize('source', [_reader(), _iterable()])
+def test_empty_stream(source):
+    assert _collect(source, 10) == []
+
+
+@pytest.mark.parametrize('source', [_reader(PAYLOAD[:-1]), _iterable(PAYLOAD[:-1])])
+def test_incomplete_record(source):
+    with pytest.raises(ValueError) as exc_info:
+        _collect(source, 10)
+    assert exc_info.match(r'stream ended in the middle of record \(25 of 26 bytes\)')
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError) as exc_info:
+        _collect(_reader(PAYLOAD), 0)
+    assert exc_info.match('batch_size must be positive')
+
+
+def test_bit_field_formats():
+    @dataclass
+    class A:
+        a: int = BitField(7)  # type: ignore
+        b: int = BitField(9, signed=True)  # type: ignore
+        c: int = BitField(32)  # type: ignore
+        d: int = BitField(33, signed=True)  # type: ignore
+        e: bool = BitField(1, kind=bool)  # type: ignore
+
+    assert struct_layout(dataslots(A)).format == '<BhIq?'
+
+
+def test_without_layout():
+    @dataclass
+    class A:
+        x: str
+
+    @dataclass
+    class B:
+        x: List[int]
+
+    for cls in (A, B):
+        with pytest.raises(TypeError) as exc_info:
+            struct_layout(cls)
+        assert exc_info.match("field 'x' has no fixed-size layout, define it with field metadata {'struct': ...}")
+
+
+def test_too_wide_bit_field():
+    @dataslots
+    @dataclass
+    class A:
+        x: int = BitField(65)  # type: ignore
+
+    with pytest.raises(TypeError) as exc_info:
+        struct_layout(A)
+    assert exc_info.match("BitField 'x' is too wide for struct layout")
+
+
+def test_unresolved_annotations():
+    @dataclass
+    class A:
+        x: 'Unknown' = field(metadata={'struct': 'H'})  # type: ignore # noqa: F821
+        y: float = 0.0
+
+    assert struct_layout(A).format == '<Hd'
+
+
+def test_invalid_options():
+    with pytest.raises(TypeError) as exc_info:
+        struct_layout(int)
+    assert exc_info.match('struct_layout can be used only with dataclass')
+
+    with pytest.raises(ValueError) as exc_info_byteorder:
+        struct_layout(Trade, '@')
+    assert exc_info_byteorder.match('byteorder must be one of: <, >, !, =')